@@ -15,9 +15,12 @@ Imported by: main.py, score_skills.py
 from __future__ import annotations
 
 import json
+import mmap
+import pickle
 import re
 import sys
 from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -29,6 +32,7 @@ if sys.stdout.encoding != "utf-8":
 REPO_ROOT         = Path(__file__).parent.parent
 MOCK_DATA_PATH    = REPO_ROOT / "coverageiq" / "lib" / "mock-data.ts"
 SKILL_SCORES_PATH = Path(__file__).parent / "skill_scores.json"
+MOCK_CACHE_PATH   = Path(__file__).parent / ".mock_data.cache.pkl"
 
 # Members with associated ICS files.  Add entries here as more calendars are linked.
 # Key = Slack/system memberId, Value = path relative to backend/.
@@ -38,43 +42,68 @@ CALENDAR_ICS_MAP: dict[str, Path] = {
 
 
 # ── TypeScript parser helpers ──────────────────────────────────────────────────
+# Each object literal is scanned once: _scalar_fields() walks every
+# `key: value` pair in a single finditer pass and the parser then reads fields
+# out of the resulting dict, instead of running one regex search per field.
+# (A json.loads round-trip isn't an option — the arrays contain
+# `new Date(now.getTime() + …)` expressions and `atRiskTasks[i]` references.)
 
-def _str_field(text: str, field: str) -> Optional[str]:
-    """Extract a single/double-quoted string field value."""
-    match = re.search(
-        rf"{re.escape(field)}:\s*(?:'([^']*)'|\"([^\"]*)\")", text
-    )
-    if not match:
-        return None
-    return match.group(1) if match.group(1) is not None else match.group(2)
+_SCALAR_FIELD_RE = re.compile(
+    r"""\b(\w+):\s*(?:'([^']*)'|"([^"]*)"|(true|false)\b|([0-9]+(?:\.[0-9]+)?))"""
+)
+_QUOTED_ITEM_RE = re.compile(r"['\"]([^'\"]+)['\"]")
+
+Scalar = str | bool | int | float
+
+
+def _scalar_fields(text: str) -> dict[str, Scalar]:
+    """
+    Collect every string/boolean/number `key: value` pair in an object literal,
+    including those of nested objects.  The first occurrence of a key wins.
+    """
+    fields: dict[str, Scalar] = {}
+    for key, sq, dq, boolean, number in _SCALAR_FIELD_RE.findall(text):
+        if key in fields:
+            continue
+        if boolean:
+            fields[key] = boolean == "true"
+        elif number:
+            fields[key] = float(number) if "." in number else int(number)
+        else:
+            fields[key] = sq or dq
+    return fields
 
 
-def _int_field(text: str, field: str) -> Optional[int]:
-    """Extract an integer field value."""
-    match = re.search(rf"{re.escape(field)}:\s*(\d+)", text)
-    return int(match.group(1)) if match else None
+def _as_str(value: Optional[Scalar]) -> Optional[str]:
+    return value if isinstance(value, str) else None
 
 
-def _float_field(text: str, field: str) -> Optional[float]:
-    """Extract a float/integer field value."""
-    match = re.search(rf"{re.escape(field)}:\s*([0-9]+(?:\.[0-9]+)?)", text)
-    return float(match.group(1)) if match else None
+def _as_int(value: Optional[Scalar]) -> Optional[int]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return int(value)
 
 
-def _bool_field(text: str, field: str) -> Optional[bool]:
-    """Extract a boolean field value (true/false)."""
-    match = re.search(rf"{re.escape(field)}:\s*(true|false)", text)
-    if not match:
+def _as_float(value: Optional[Scalar]) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
         return None
-    return match.group(1) == "true"
+    return float(value)
+
+
+@lru_cache(maxsize=None)
+def _list_pat(field: str) -> re.Pattern[str]:
+    return re.compile(rf"{re.escape(field)}:\s*\[([^\]]+)\]")
 
 
 def _list_field(text: str, field: str) -> list[str]:
     """Extract a string array field, e.g. skills: ['a', 'b']."""
-    match = re.search(rf"{re.escape(field)}:\s*\[([^\]]+)\]", text)
+    match = _list_pat(field).search(text)
     if not match:
         return []
-    return re.findall(r"['\"]([^'\"]+)['\"]", match.group(1))
+    return _QUOTED_ITEM_RE.findall(match.group(1))
+
+
+_BRACE_RE = re.compile(r"[{}]")
 
 
 def _split_objects(block: str) -> list[str]:
@@ -82,12 +111,14 @@ def _split_objects(block: str) -> list[str]:
     objects = []
     depth   = 0
     start   = None
-    for i, ch in enumerate(block):
-        if ch == "{":
+    # Jump straight from brace to brace rather than visiting every character
+    for m in _BRACE_RE.finditer(block):
+        i = m.start()
+        if m.group() == "{":
             if depth == 0:
                 start = i
             depth += 1
-        elif ch == "}":
+        else:
             depth -= 1
             if depth == 0 and start is not None:
                 objects.append(block[start: i + 1])
@@ -95,6 +126,66 @@ def _split_objects(block: str) -> list[str]:
     return objects
 
 
+_BRACKET_RE       = re.compile(r"[\[\]]")
+_BRACKET_BYTES_RE = re.compile(rb"[\[\]]")
+
+
+def _balanced_bracket(src, start: int) -> Optional[str]:
+    """
+    Body of the [ ] bracket opening at src[start], excluding the brackets.
+    `src` may be a str or a bytes-like buffer (e.g. an mmap); a buffer slice
+    is decoded as UTF-8.
+    """
+    if start < 0:
+        return None
+    is_text = isinstance(src, str)
+    depth = 0
+    for m in (_BRACKET_RE if is_text else _BRACKET_BYTES_RE).finditer(src, start):
+        if m.group() in ("[", b"["):
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                body = src[start + 1: m.start()]
+                return body if is_text else body.decode("utf-8")
+    return None
+
+
+def _slice_array(buf, name: str) -> Optional[str]:
+    """
+    Decoded body of the array literal assigned by `export const <name>` in a
+    bytes-like buffer, located with plain find() rather than a DOTALL regex.
+    Skips any type annotation (e.g. `: Task[]`) before the `=`.  None if the
+    export is absent.
+    """
+    i = buf.find(f"export const {name}".encode())
+    if i < 0:
+        return None
+    i = buf.find(b"=", i)
+    return _balanced_bracket(buf, buf.find(b"[", i)) if i >= 0 else None
+
+
+def _read_arrays(path: Path, *names: str) -> list[Optional[str]]:
+    """
+    Bodies of the named `export const` arrays in a TS file (see _slice_array).
+    The file is mmap'd and searched in place, so only the array slices are
+    ever decoded rather than the whole file.
+    """
+    with open(path, "rb") as f:
+        if path.stat().st_size == 0:
+            return [None] * len(names)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [_slice_array(mm, name) for name in names]
+
+
+_DEADLINE_DAYS_RE = re.compile(
+    r"now\.getTime\(\)\s*\+\s*(\d+)\s*\*\s*24\s*\*\s*60\s*\*\s*60\s*\*\s*1000"
+)
+_DEADLINE_HOURS_RE = re.compile(
+    r"now\.getTime\(\)\s*\+\s*(\d+)\s*\*\s*60\s*\*\s*60\s*\*\s*1000"
+)
+
+
 def _parse_deadline_hours(block: str) -> Optional[float]:
     """
     Extract the deadline hour-offset from TS patterns like:
@@ -102,18 +193,12 @@ def _parse_deadline_hours(block: str) -> Optional[float]:
         new Date(now.getTime() + 5 * 24 * 60 * 60 * 1000)   → 120 h
     """
     # Days form (more specific, checked first)
-    m = re.search(
-        r"now\.getTime\(\)\s*\+\s*(\d+)\s*\*\s*24\s*\*\s*60\s*\*\s*60\s*\*\s*1000",
-        block,
-    )
+    m = _DEADLINE_DAYS_RE.search(block)
     if m:
         return float(m.group(1)) * 24
 
     # Hours form
-    m = re.search(
-        r"now\.getTime\(\)\s*\+\s*(\d+)\s*\*\s*60\s*\*\s*60\s*\*\s*1000",
-        block,
-    )
+    m = _DEADLINE_HOURS_RE.search(block)
     if m:
         return float(m.group(1))
 
@@ -122,40 +207,69 @@ def _parse_deadline_hours(block: str) -> Optional[float]:
 
 # ── Mock-data.ts parser ────────────────────────────────────────────────────────
 
+_TASK_REF_RE = re.compile(r"atRiskTasks\[(\d+)\]")
+
+# Bump when the parser's output shape changes so stale caches are ignored.
+_MOCK_CACHE_VERSION = 1
+
+
 def parse_mock_data(path: Path) -> tuple[list[dict], dict[str, dict]]:
     """
     Parse atRiskTasks and teamMembers from mock-data.ts.
 
+    The parsed result is pickled to MOCK_CACHE_PATH keyed by the file's path,
+    mtime and size, so repeat runs skip parsing until mock-data.ts changes.
+    Every call returns fresh objects, so callers may mutate them freely.
+
     Returns:
         tasks:   list of task dicts — id, title, priority, status, assigneeId,
                  projectName, deadline_hours_offset, suggestions (with skill scores)
         members: dict keyed by memberId → full member dict including dataSources,
                  weekAvailability, confidenceScore, isOOO, currentTaskIndices
     """
-    source = path.read_text(encoding="utf-8")
+    st  = path.stat()
+    key = (_MOCK_CACHE_VERSION, str(path.resolve()), st.st_mtime_ns, st.st_size)
+
+    try:
+        cached_key, tasks, members = pickle.loads(MOCK_CACHE_PATH.read_bytes())
+        if cached_key == key:
+            return tasks, members
+    except Exception:
+        pass  # missing, stale-format or corrupt cache — fall through and re-parse
+
+    tasks, members = _parse_mock_data_uncached(path)
+    try:
+        MOCK_CACHE_PATH.write_bytes(pickle.dumps((key, tasks, members)))
+    except OSError:
+        pass  # read-only checkout — caching is best-effort
+    return tasks, members
+
+
+def _parse_mock_data_uncached(path: Path) -> tuple[list[dict], dict[str, dict]]:
+    """Parse mock-data.ts from scratch (see parse_mock_data)."""
+    tasks_body, members_body = _read_arrays(path, "atRiskTasks", "teamMembers")
 
     # ── Tasks ──────────────────────────────────────────────────────────────────
-    tasks_match = re.search(
-        r"export const atRiskTasks[^=]*=\s*\[(.+?)\];\s*\n",
-        source, re.DOTALL,
-    )
-    if not tasks_match:
+    if tasks_body is None:
         raise ValueError("Could not locate atRiskTasks array in mock-data.ts")
 
     tasks: list[dict] = []
-    for task_block in _split_objects(tasks_match.group(1)):
-        task_id = _str_field(task_block, "id")
+    for task_block in _split_objects(tasks_body):
+        fields = _scalar_fields(task_block)
+        task_id = _as_str(fields.get("id"))
         if not task_id:
             continue
 
-        sugg_match = re.search(r"suggestions:\s*\[(.+?)\]", task_block, re.DOTALL)
+        sugg_at   = task_block.find("suggestions:")
+        sugg_body = _balanced_bracket(task_block, task_block.find("[", sugg_at)) if sugg_at >= 0 else None
         suggestions: list[dict] = []
-        if sugg_match:
-            for s in _split_objects(sugg_match.group(1)):
-                mid    = _str_field(s, "memberId")
-                reason = _str_field(s, "contextReason")
-                skill  = _int_field(s, "skillMatchPct")
-                wload  = _int_field(s, "workloadPct")
+        if sugg_body:
+            for s in _split_objects(sugg_body):
+                sf     = _scalar_fields(s)
+                mid    = _as_str(sf.get("memberId"))
+                reason = _as_str(sf.get("contextReason"))
+                skill  = _as_int(sf.get("skillMatchPct"))
+                wload  = _as_int(sf.get("workloadPct"))
                 if mid:
                     suggestions.append({
                         "memberId":     mid,
@@ -166,66 +280,54 @@ def parse_mock_data(path: Path) -> tuple[list[dict], dict[str, dict]]:
 
         tasks.append({
             "id":                    task_id,
-            "title":                 _str_field(task_block, "title")    or "",
-            "priority":              _str_field(task_block, "priority") or "",
-            "status":                _str_field(task_block, "status")   or "at-risk",
-            "assigneeId":            _str_field(task_block, "assigneeId") or "",
-            "projectName":           _str_field(task_block, "projectName") or "",
+            "title":                 _as_str(fields.get("title"))    or "",
+            "priority":              _as_str(fields.get("priority")) or "",
+            "status":                _as_str(fields.get("status"))   or "at-risk",
+            "assigneeId":            _as_str(fields.get("assigneeId")) or "",
+            "projectName":           _as_str(fields.get("projectName")) or "",
             "deadline_hours_offset": _parse_deadline_hours(task_block),
             "suggestions":           suggestions,
         })
 
     # ── Members ────────────────────────────────────────────────────────────────
-    members_match = re.search(
-        r"export const teamMembers[^=]*=\s*\[(.+)\];\s*\n",
-        source, re.DOTALL,
-    )
-    if not members_match:
+    if members_body is None:
         raise ValueError("Could not locate teamMembers array in mock-data.ts")
 
     members: dict[str, dict] = {}
-    for mem_block in _split_objects(members_match.group(1)):
-        mid = _str_field(mem_block, "id")
+    for mem_block in _split_objects(members_body):
+        # One scan covers the nested dataSources / weekAvailability objects too;
+        # their keys don't collide with the member's own.
+        fields = _scalar_fields(mem_block)
+        mid = _as_str(fields.get("id"))
         if not mid or not mid.startswith("mem-"):
             continue
 
         # dataSources sub-object: { calendarPct: N, taskLoadHours: N, leaveStatus: '...' }
-        ds_match = re.search(r"dataSources:\s*\{([^}]+)\}", mem_block)
-        data_sources: dict = {"calendarPct": 0, "taskLoadHours": 0.0, "leaveStatus": "available"}
-        if ds_match:
-            ds = ds_match.group(1)
-            data_sources = {
-                "calendarPct":   _int_field(ds, "calendarPct")   or 0,
-                "taskLoadHours": _float_field(ds, "taskLoadHours") or 0.0,
-                "leaveStatus":   _str_field(ds, "leaveStatus")   or "available",
-            }
+        data_sources: dict = {
+            "calendarPct":   _as_int(fields.get("calendarPct"))     or 0,
+            "taskLoadHours": _as_float(fields.get("taskLoadHours")) or 0.0,
+            "leaveStatus":   _as_str(fields.get("leaveStatus"))     or "available",
+        }
 
         # weekAvailability sub-object: { monday: N, tuesday: N, ... }
-        wa_match = re.search(r"weekAvailability:\s*\{([^}]+)\}", mem_block)
-        week_avail: dict = {d: 0 for d in ("monday", "tuesday", "wednesday", "thursday", "friday")}
-        if wa_match:
-            wa = wa_match.group(1)
-            week_avail = {
-                "monday":    _int_field(wa, "monday")    or 0,
-                "tuesday":   _int_field(wa, "tuesday")   or 0,
-                "wednesday": _int_field(wa, "wednesday") or 0,
-                "thursday":  _int_field(wa, "thursday")  or 0,
-                "friday":    _int_field(wa, "friday")    or 0,
-            }
+        week_avail: dict = {
+            d: _as_int(fields.get(d)) or 0
+            for d in ("monday", "tuesday", "wednesday", "thursday", "friday")
+        }
 
         # currentTasks references: e.g. [atRiskTasks[0], atRiskTasks[2]]
-        current_task_indices = list(map(int, re.findall(r"atRiskTasks\[(\d+)\]", mem_block)))
+        current_task_indices = list(map(int, _TASK_REF_RE.findall(mem_block)))
 
         members[mid] = {
             "id":                 mid,
-            "name":               _str_field(mem_block, "name")          or mid,
-            "role":               _str_field(mem_block, "role")          or "",
-            "team":               _str_field(mem_block, "team")          or "Engineering",
-            "confidenceScore":    _int_field(mem_block, "confidenceScore") or 50,
+            "name":               _as_str(fields.get("name"))            or mid,
+            "role":               _as_str(fields.get("role"))            or "",
+            "team":               _as_str(fields.get("team"))            or "Engineering",
+            "confidenceScore":    _as_int(fields.get("confidenceScore")) or 50,
             "skills":             _list_field(mem_block, "skills"),
             "dataSources":        data_sources,
             "currentTaskIndices": current_task_indices,
-            "isOOO":              _bool_field(mem_block, "isOOO") or False,
+            "isOOO":              fields.get("isOOO") is True,
             "weekAvailability":   week_avail,
         }
 
@@ -236,14 +338,14 @@ def parse_mock_data(path: Path) -> tuple[list[dict], dict[str, dict]]:
 
 def parse_week_chart_data(path: Path) -> list[dict]:
     """Parse the weekChartData export: [{ day: 'Mon', available: 16 }, ...]."""
-    source = path.read_text(encoding="utf-8")
-    match = re.search(r"export const weekChartData\s*=\s*\[([^\]]+)\]", source, re.DOTALL)
-    if not match:
+    (body,) = _read_arrays(path, "weekChartData")
+    if not body:
         return []
     points = []
-    for obj in _split_objects(match.group(1)):
-        day = _str_field(obj, "day")
-        avail = _int_field(obj, "available")
+    for obj in _split_objects(body):
+        fields = _scalar_fields(obj)
+        day = _as_str(fields.get("day"))
+        avail = _as_int(fields.get("available"))
         if day and avail is not None:
             points.append({"day": day, "available": avail})
     return points
@@ -0,0 +1,132 @@
+"""
+embeddings.py
+-------------
+Sentence-embedding relevance for the skill pipeline.
+
+Each member's role + skills string is embedded once with a small
+sentence-transformers model and kept as one row of a float32 matrix, so a
+task is ranked against the whole roster with a single matrix-vector product.
+Rows are persisted to member_embeddings.npz next to the DB and re-embedded
+only when a member's profile text changes (or a new member appears).
+
+Optional: requires numpy and sentence-transformers.  When either is missing,
+EMBEDDINGS_AVAILABLE is False and skill_pipeline keeps its keyword heuristic.
+"""
+
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    EMBEDDINGS_AVAILABLE = True
+except ImportError:
+    EMBEDDINGS_AVAILABLE = False
+
+from models import Task, TeamMember
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDINGS_PATH = Path(__file__).parent / "member_embeddings.npz"
+
+_lock = threading.Lock()
+_model = None
+_rows: dict[str, tuple[str, "np.ndarray"]] | None = None  # member_id → (profile, vector)
+
+
+# ── Text ───────────────────────────────────────────────────────────────────────
+
+def _task_text(task: Task) -> str:
+    return f"{task.title} ({task.project_name})"
+
+
+def _member_profile(member: TeamMember) -> str:
+    return f"{member.role}: {', '.join(member.skills or [])}"
+
+
+# ── Model + row store ──────────────────────────────────────────────────────────
+
+def _get_model():
+    global _model
+    if _model is None:
+        print(f"[embeddings] Loading {EMBEDDING_MODEL}")
+        _model = SentenceTransformer(EMBEDDING_MODEL)
+    return _model
+
+
+def _encode(texts: list[str]) -> "np.ndarray":
+    """Unit-length float32 rows, so a dot product is cosine similarity."""
+    return _get_model().encode(
+        texts, normalize_embeddings=True, convert_to_numpy=True
+    ).astype(np.float32, copy=False)
+
+
+def _load_rows() -> dict[str, tuple[str, "np.ndarray"]]:
+    if not EMBEDDINGS_PATH.exists():
+        return {}
+    try:
+        with np.load(EMBEDDINGS_PATH) as data:
+            return {
+                str(mid): (str(profile), vec)
+                for mid, profile, vec in zip(data["ids"], data["profiles"], data["matrix"])
+            }
+    except Exception as exc:
+        print(f"[embeddings] Ignoring unreadable {EMBEDDINGS_PATH.name}: {exc}")
+        return {}
+
+
+def _save_rows(rows: dict[str, tuple[str, "np.ndarray"]]) -> None:
+    ids = list(rows)
+    tmp = EMBEDDINGS_PATH.with_suffix(".tmp.npz")
+    np.savez(
+        tmp,
+        ids=np.array(ids),
+        profiles=np.array([rows[i][0] for i in ids]),
+        matrix=np.stack([rows[i][1] for i in ids]),
+    )
+    tmp.replace(EMBEDDINGS_PATH)
+
+
+def _member_matrix(members: list[TeamMember]) -> "np.ndarray":
+    """
+    (len(members), dim) matrix in input order.  Only members whose profile
+    text is new or changed are sent through the model.
+    """
+    global _rows
+    with _lock:
+        if _rows is None:
+            _rows = _load_rows()
+
+        stale = [m for m in members if _rows.get(m.id, ("",))[0] != _member_profile(m)]
+        if stale:
+            vectors = _encode([_member_profile(m) for m in stale])
+            for member, vec in zip(stale, vectors):
+                _rows[member.id] = (_member_profile(member), vec)
+            _save_rows(_rows)
+
+        return np.stack([_rows[m.id][1] for m in members])
+
+
+@lru_cache(maxsize=256)
+def _task_vector(text: str) -> "np.ndarray":
+    with _lock:
+        return _encode([text])[0]
+
+
+# ── Public API ─────────────────────────────────────────────────────────────────
+
+def similarities(task: Task, members: list[TeamMember]) -> "np.ndarray":
+    """Cosine similarity of the task to each member's profile, in input order."""
+    if not members:
+        return np.zeros(0, dtype=np.float32)
+    return _member_matrix(members) @ _task_vector(_task_text(task))
+
+
+def top_members(task: Task, members: list[TeamMember], k: int) -> list[TeamMember]:
+    """The k members most similar to the task, best first."""
+    sims = similarities(task, members)
+    if len(members) > k:
+        top = np.argpartition(sims, -k)[-k:]
+    else:
+        top = np.arange(len(members))
+    return [members[i] for i in top[np.argsort(-sims[top])]]
@@ -16,9 +16,9 @@ if sys.stdout.encoding != "utf-8":
     sys.stdout.reconfigure(encoding="utf-8")
 
 from dotenv import load_dotenv
-from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
+from slack_client import get_slack_client
 from slack_parser import TimeOffEntry, fetch_and_parse
 
 load_dotenv()
@@ -57,7 +57,7 @@ def print_entry(entry: TimeOffEntry) -> None:
 
 
 def main(hours_back: int, limit: int) -> None:
-    slack = WebClient(token=SLACK_BOT_TOKEN)
+    slack = get_slack_client()
 
     try:
         channel_name = slack.conversations_info(channel=SLACK_CHANNEL_ID)["channel"]["name"]
@@ -70,7 +70,7 @@ def main(hours_back: int, limit: int) -> None:
     print(f"Channel     : #{channel_name} ({SLACK_CHANNEL_ID})")
     print(f"Looking back: {hours_back} hours  |  max messages: {limit}")
 
-    entries = fetch_and_parse(slack, SLACK_CHANNEL_ID, hours_back, limit)
+    entries = fetch_and_parse(SLACK_CHANNEL_ID, hours_back, limit)
 
     if not entries:
         print("\nNo time-off messages found.")
@@ -24,6 +24,8 @@ Gmail OOO endpoints:
     GET  /gmail/debug                     → debug Gmail pipeline (no DB writes)
 """
 
+import asyncio
+import contextlib
 import logging
 import os
 import sys
@@ -40,11 +42,13 @@ logging.basicConfig(
 if sys.stdout.encoding != "utf-8":
     sys.stdout.reconfigure(encoding="utf-8")
 
+import anyio
 from dotenv import load_dotenv
-from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+import msgspec
 from pydantic import BaseModel
-from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from sqlmodel import Session
 
@@ -57,7 +61,15 @@ from routers.calendar import router as calendar_router
 from routers.gmail import router as gmail_router
 from routers.chat import router as chat_router
 from seed import seed
-from slack_parser import TimeOffEntry, fetch_and_parse, fetch_and_parse_debug
+from skill_pipeline import drain_pipeline, invalidate_members_cache, pipeline_worker
+from slack_client import close_async_slack_client, get_async_slack_client, get_slack_client
+from slack_parser import (
+    fetch_and_parse_async,
+    fetch_and_parse_debug_async,
+    TimeOffEntry,
+    iter_and_parse,
+    load_user_cache,
+)
 
 load_dotenv()
 
@@ -82,8 +94,22 @@ missing = [k for k, v in {
 if missing:
     raise RuntimeError(f"Missing environment variables: {', '.join(missing)}")
 
-# ── Slack client (shared, created once at startup) ─────────────────────────────
-slack_client = WebClient(token=SLACK_BOT_TOKEN)
+# ── Slack clients ──────────────────────────────────────────────────────────────
+# Sync client for one-off calls (DM pings).  The time-off routes use the
+# app loop's pooled AsyncWebClient (get_async_slack_client), closed on shutdown.
+slack_client = get_slack_client()
+
+
+async def _fetch_timeoff(hours: int, limit: int):
+    return await fetch_and_parse_async(
+        get_async_slack_client(), SLACK_CHANNEL_ID, hours_back=hours, limit=limit
+    )
+
+
+async def _fetch_timeoff_debug(hours: int, limit: int):
+    return await fetch_and_parse_debug_async(
+        get_async_slack_client(), SLACK_CHANNEL_ID, hours_back=hours, limit=limit
+    )
 
 
 # ── Lifespan: init DB and seed on first boot ───────────────────────────────────
@@ -92,7 +118,14 @@ async def lifespan(app: FastAPI):
     create_db_and_tables()
     with Session(engine) as db:
         seed(db)  # no-op if already seeded
+    load_user_cache()  # Slack display names persisted by the previous process
+    worker = asyncio.create_task(pipeline_worker())
     yield
+    await drain_pipeline()  # let queued suggestion runs finish, up to a timeout
+    worker.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await worker
+    await close_async_slack_client()
 
 
 # ── App ────────────────────────────────────────────────────────────────────────
@@ -122,6 +155,12 @@ app.include_router(chat_router)
 
 
 # ── Core routes ────────────────────────────────────────────────────────────────
+# GET /timeoff encodes with msgspec, bypassing response_model, so its 200 schema
+# is declared explicitly.  TimeOffEntry is inlined because msgspec's $refs
+# would point into a $defs block that OpenAPI doesn't resolve.
+_, _timeoff_components = msgspec.json.schema_components([TimeOffEntry])
+TIMEOFF_LIST_SCHEMA = {"type": "array", "items": _timeoff_components["TimeOffEntry"]}
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
@@ -135,31 +174,58 @@ def summary(db: Session = Depends(get_session)):
 # ── Slack / time-off routes ────────────────────────────────────────────────────
 @app.get(
     "/timeoff",
-    response_model=list[TimeOffEntry],
+    response_class=Response,
+    responses={200: {"content": {"application/json": {"schema": TIMEOFF_LIST_SCHEMA}}}},
     summary="Get time-off announcements",
     description=(
         "Fetches recent Slack messages and returns a JSON list of detected "
         "time-off entries. Only messages that Gemini classifies as time-off "
-        "requests or announcements are included."
+        "requests or announcements are included. "
+        "Send `Accept: application/x-ndjson` to stream entries one per line as "
+        "each Gemini batch completes (in completion order) instead."
     ),
 )
-def get_timeoff(
+async def get_timeoff(
     hours: int = Query(default=24, ge=1, le=720, description="How many hours back to look"),
     limit: int = Query(default=100, ge=1, le=999, description="Max messages to fetch from Slack"),
+    accept: str = Header(default=""),
 ):
+    if "application/x-ndjson" in accept:
+        return await _stream_timeoff(hours, limit)
+
     try:
-        entries = fetch_and_parse(
-            slack=slack_client,
-            channel_id=SLACK_CHANNEL_ID,
-            hours_back=hours,
-            limit=limit,
-        )
+        entries = await _fetch_timeoff(hours, limit)
+    except SlackApiError as e:
+        raise HTTPException(status_code=502, detail=f"Slack error: {e.response['error']}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # TimeOffEntry is a msgspec Struct — encode the list in one pass
+    return Response(content=msgspec.json.encode(entries), media_type="application/json")
+
+
+async def _stream_timeoff(hours: int, limit: int) -> StreamingResponse:
+    """NDJSON variant of GET /timeoff: one entry per line, as soon as it is parsed."""
+    entries = iter_and_parse(
+        get_async_slack_client(), SLACK_CHANNEL_ID, hours_back=hours, limit=limit
+    )
+    # Wait for the first entry before committing to a 200, so Slack and
+    # Gemini failures up to that point still map to a proper error status
+    try:
+        first = await anext(entries, None)
     except SlackApiError as e:
         raise HTTPException(status_code=502, detail=f"Slack error: {e.response['error']}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    return entries
+    async def lines():
+        if first is None:
+            return
+        yield msgspec.json.encode(first) + b"\n"
+        async for entry in entries:
+            yield msgspec.json.encode(entry) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 @app.post(
@@ -184,18 +250,16 @@ def post_timeoff_sync(
     tick_slack_ooo_status(db)
 
     try:
-        entries = fetch_and_parse(
-            slack=slack_client,
-            channel_id=SLACK_CHANNEL_ID,
-            hours_back=hours,
-            limit=limit,
-        )
+        # Sync route (DB session) — hop onto the app loop to share its Slack pool
+        entries = anyio.from_thread.run(_fetch_timeoff, hours, limit)
     except SlackApiError as e:
         raise HTTPException(status_code=502, detail=f"Slack error: {e.response['error']}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    return apply_timeoff_entries(db, entries)
+    result = apply_timeoff_entries(db, entries)
+    invalidate_members_cache()
+    return result
 
 
 @app.get(
@@ -214,12 +278,7 @@ def get_timeoff_debug(
     db: Session = Depends(get_session),
 ):
     try:
-        entries, debug_rows = fetch_and_parse_debug(
-            slack=slack_client,
-            channel_id=SLACK_CHANNEL_ID,
-            hours_back=hours,
-            limit=limit,
-        )
+        entries, debug_rows = anyio.from_thread.run(_fetch_timeoff_debug, hours, limit)
     except SlackApiError as e:
         raise HTTPException(status_code=502, detail=f"Slack error: {e.response['error']}")
     except Exception as e:
@@ -237,6 +296,7 @@ def get_timeoff_debug(
     total = len(debug_rows)
     filtered = sum(1 for r in debug_rows if r["filtered"])
     human = total - filtered
+    sent = sum(1 for r in debug_rows if r.get("cached") is False)
     detected = sum(1 for r in debug_rows if r.get("is_time_off"))
     would_apply = sum(
         1 for v in match_results.values() if v.startswith("matched:")
@@ -248,7 +308,7 @@ def get_timeoff_debug(
         total_fetched=total,
         human_messages=human,
         filtered_messages=filtered,
-        sent_to_gemini=human,
+        sent_to_gemini=sent,
         time_off_detected=detected,
         would_apply=would_apply,
         messages=[MessageDebug(**r) for r in debug_rows],
@@ -210,6 +210,7 @@ class MessageDebug(BaseModel):
     text_preview:   str             # first 120 chars of raw message
     filtered:       bool = False    # True if skipped before Gemini (subtype / empty)
     filter_reason:  Optional[str] = None
+    cached:         Optional[bool] = None  # True if parsed from cache / a duplicate, not sent to Gemini
     is_time_off:    Optional[bool] = None
     person_username: Optional[str] = None
     start_date:     Optional[str] = None
@@ -0,0 +1,67 @@
+"""
+rate_limit.py
+-------------
+Token-bucket pacing for outbound Gemini calls.
+
+One bucket is shared by every Gemini caller in the process, so concurrent
+callers draw from the same free-tier RPM quota instead of each sleeping a
+fixed interval between calls.
+"""
+
+import asyncio
+import threading
+import time
+
+GEMINI_RPM = 15    # free-tier requests per minute
+GEMINI_BURST = 3   # calls allowed back-to-back before pacing kicks in
+
+
+class TokenBucket:
+    """
+    Bucket refilled continuously at `rate` tokens/second, holding at most
+    `capacity` tokens.  A caller reserves its token up front and then waits
+    only while the bucket is in debt, so time spent inside the previous
+    request counts toward the interval.
+
+    The reservation is guarded by a threading.Lock (never held across an
+    await), so one bucket can be shared by several event loops and threads.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        # Caller holds self._lock
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def _reserve(self) -> float:
+        """Take one token and return how long to wait before it may be used."""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def penalize(self, delay: float) -> None:
+        """
+        Hold back the next token for at least `delay` seconds.  Called when the
+        API answers 429 with a retry-after, so every caller sharing the bucket
+        backs off — not just the one whose request was rejected.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 1 - delay * self.rate)
+
+    async def acquire(self) -> None:
+        """Wait until a token is available."""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+gemini_bucket = TokenBucket(rate=GEMINI_RPM / 60, capacity=GEMINI_BURST)
@@ -32,6 +32,7 @@ from calendar_availability import get_availability_report
 from crud import update_member_calendar_pct, update_member_week_availability
 from database import engine
 from models import TeamMember
+from skill_pipeline import invalidate_members_cache
 
 router = APIRouter()
 
@@ -235,6 +236,7 @@ async def upload_calendars(files: list[UploadFile] = File(...)):
                     db.commit()
                 update_member_calendar_pct(db, member.id, report["availability_pct"])
                 update_member_week_availability(db, member.id, per_day)
+            invalidate_members_cache()
 
             processed.append({
                 "memberId": member.id,
@@ -14,7 +14,6 @@ Write actions are gated by a confirmation step enforced in the system prompt.
 from __future__ import annotations
 
 import json
-import threading
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 
@@ -48,6 +47,7 @@ from crud import (
 )
 from database import get_session
 from models import TaskCreate
+from skill_pipeline import enqueue_pipeline, invalidate_members_cache
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
@@ -96,7 +96,9 @@ agent = Agent(
 @agent.tool
 def tool_get_members(ctx: RunContext[ChatDeps]) -> str:
     """Get all team members with their availability, skills, and leave status."""
-    tick_slack_ooo_status(ctx.deps.db)
+    activated, restored = tick_slack_ooo_status(ctx.deps.db)
+    if activated or restored:
+        invalidate_members_cache()
     members = get_all_members(ctx.deps.db)
     return json.dumps([m.model_dump() for m in members], default=str)
 
@@ -183,8 +185,7 @@ def tool_create_task(
         projectName=project_name,
     )
     row = crud_create_task(ctx.deps.db, body)
-    from skill_pipeline import run_pipeline_for_task
-    threading.Thread(target=run_pipeline_for_task, args=(row.id,), daemon=True).start()
+    enqueue_pipeline(row.id)
     return f"Task '{row.id}' created: '{title}' ({priority}, deadline in {deadline_hours}h)."
 
 
@@ -205,6 +206,7 @@ def tool_override_member_status(
     row = update_member_override(ctx.deps.db, member_id, status)
     if not row:
         return f"Member '{member_id}' not found."
+    invalidate_members_cache()
     return f"Member '{member_id}' leave status overridden to '{status}'."
 
 
@@ -214,6 +216,7 @@ def tool_clear_member_override(ctx: RunContext[ChatDeps], member_id: str) -> str
     row = reset_member_override(ctx.deps.db, member_id)
     if not row:
         return f"Member '{member_id}' not found."
+    invalidate_members_cache()
     return f"Member '{member_id}' override cleared."
 
 
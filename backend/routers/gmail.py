@@ -18,6 +18,7 @@ from crud import _best_member_match, _parse_date_str, apply_timeoff_entries, tic
 from database import get_session
 from gmail_parser import fetch_and_parse_gmail, fetch_and_parse_gmail_debug, is_gmail_configured
 from models import TeamMember, TimeOffSyncResult
+from skill_pipeline import invalidate_members_cache
 
 logger = logging.getLogger(__name__)
 
@@ -75,6 +76,7 @@ def scan_gmail(
     # Run the OOO scheduler so any entries whose start_date has arrived
     # are immediately activated (is_ooo = True, leave_status = "ooo")
     tick_slack_ooo_status(db)
+    invalidate_members_cache()
 
     logger.info(
         "Gmail scan result: detected=%d applied=%d pending=%d skipped=%d",
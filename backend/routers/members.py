@@ -31,6 +31,7 @@ from crud import (
 )
 from database import get_session
 from models import NotesUpdate, OverrideUpdate, SkillsUpdate, TeamMemberOut
+from skill_pipeline import invalidate_members_cache
 
 router = APIRouter(prefix="/members", tags=["members"])
 
@@ -42,7 +43,9 @@ _BACKEND_DIR = Path(__file__).parent.parent
 def list_members(db: Session = Depends(get_session)):
     # Activate any pending Slack OOOs whose start date has arrived and
     # restore any that have expired — keeps the UI current without manual action.
-    tick_slack_ooo_status(db)
+    activated, restored = tick_slack_ooo_status(db)
+    if activated or restored:
+        invalidate_members_cache()
     return get_all_members(db)
 
 
@@ -69,6 +72,7 @@ def override_member(
     row = update_member_override(db, member_id, body.leaveStatus)
     if not row:
         raise HTTPException(status_code=404, detail="Member not found")
+    invalidate_members_cache()
     return get_member_out(db, member_id)
 
 
@@ -82,6 +86,7 @@ def clear_member_override(member_id: str, db: Session = Depends(get_session)):
     row = reset_member_override(db, member_id)
     if not row:
         raise HTTPException(status_code=404, detail="Member not found")
+    invalidate_members_cache()
     return get_member_out(db, member_id)
 
 
@@ -95,6 +100,7 @@ def update_skills(
     row = update_member_skills(db, member_id, body.skills)
     if not row:
         raise HTTPException(status_code=404, detail="Member not found")
+    invalidate_members_cache()
     return get_member_out(db, member_id)
 
 
@@ -108,6 +114,7 @@ def update_notes(
     row = update_member_notes(db, member_id, body.notes)
     if not row:
         raise HTTPException(status_code=404, detail="Member not found")
+    invalidate_members_cache()
     return get_member_out(db, member_id)
 
 
@@ -162,5 +169,6 @@ def sync_member_calendar(member_id: str, db: Session = Depends(get_session)):
     per_day = {day_map[d["weekday"]]: round(d["availability_pct"])
                for d in report["per_day"] if d["weekday"] in day_map}
     update_member_week_availability(db, member_id, per_day)
+    invalidate_members_cache()
 
     return get_member_out(db, member_id)
@@ -12,7 +12,7 @@ Routes:
     DELETE /tasks/{id}        → delete task and its suggestions
 """
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session
 
 from crud import (
@@ -26,7 +26,7 @@ from crud import (
 )
 from database import get_session
 from models import ReassignUpdate, StatusUpdate, TaskCreate, TaskOut
-from skill_pipeline import run_pipeline_for_task
+from skill_pipeline import enqueue_pipeline
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
@@ -37,7 +37,6 @@ _VALID_PRIORITIES = {"P0", "P1", "P2"}
 @router.post("", response_model=TaskOut, status_code=201)
 def add_task(
     body: TaskCreate,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_session),
 ):
     """Create a task. Triggers the skill pipeline in the background to compute suggestions."""
@@ -48,7 +47,7 @@ def add_task(
         )
     row = create_task(db, body)
     # Always run the pipeline so suggestions are ready for this task
-    background_tasks.add_task(run_pipeline_for_task, row.id)
+    enqueue_pipeline(row.id)
     return get_task_out(db, row.id)
 
 
@@ -109,7 +108,6 @@ def reassign_task(
 @router.patch("/{task_id}/unassign", response_model=TaskOut)
 def patch_task_unassign(
     task_id: str,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_session),
 ):
     """
@@ -119,7 +117,7 @@ def patch_task_unassign(
     row = unassign_task(db, task_id)
     if not row:
         raise HTTPException(status_code=404, detail="Task not found")
-    background_tasks.add_task(run_pipeline_for_task, task_id)
+    enqueue_pipeline(task_id)
     return get_task_out(db, task_id)
 
 
@@ -5,6 +5,10 @@ Parses coverageiq/lib/mock-data.ts, scores each task-member suggestion pair
 using Google Gemini 2.5 Flash (via pydantic-ai), and writes results to
 backend/skill_scores.json.
 
+All pending pairs for a task are marshalled into a single prompt, so Gemini is
+called once per task rather than once per pair.  Task calls run concurrently,
+paced by the shared Gemini token bucket (rate_limit.py).
+
 Inputs fed to Gemini per pair:
   - Task title, priority, status
   - Member name, role, skills
@@ -25,21 +29,23 @@ Usage:
 """
 
 import argparse
-import json
+import asyncio
 import os
+import signal
 import sys
-import time
 from pathlib import Path
 
 if sys.stdout.encoding != "utf-8":
     sys.stdout.reconfigure(encoding="utf-8")
 
+import orjson
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent
 from pydantic_ai.exceptions import ModelHTTPError
 
 from data_loader import MOCK_DATA_PATH, REPO_ROOT, parse_mock_data
+from rate_limit import gemini_bucket
 
 # ── Env setup (must happen before Agent is created) ────────────────────────────
 load_dotenv()
@@ -56,11 +62,14 @@ OUTPUT_PATH = Path(__file__).parent / "skill_scores.json"
 
 # ── Config ─────────────────────────────────────────────────────────────────────
 GEMINI_MODEL = "google-gla:gemini-2.5-flash"
-INTER_CALL_DELAY = 4   # seconds between calls — free tier is 15 RPM
+MAX_CONCURRENT = 4     # Gemini calls in flight at once; pacing is left to gemini_bucket
 MAX_RETRIES = 4
+FLUSH_EVERY = 5        # newly scored pairs between writes of skill_scores.json
 
 # ── Output model ───────────────────────────────────────────────────────────────
 class SkillScore(BaseModel):
+    pair_index: int = Field(
+        description="1-based index of the pair (as numbered in the prompt) this score is for.")
     skill_match_pct: int = Field(ge=0, le=100,
         description="Skill match percentage between the candidate and the task (0–100).")
     reasoning: str = Field(
@@ -70,17 +79,18 @@ class SkillScore(BaseModel):
 # ── Agent ──────────────────────────────────────────────────────────────────────
 agent = Agent(
     GEMINI_MODEL,
-    output_type=SkillScore,
+    output_type=list[SkillScore],
     system_prompt=(
         "You are a technical talent-matching system. "
-        "Given a task description and a team member's profile, score how well "
-        "the member's skills match the task requirements on a scale of 0–100. "
+        "Given a task description and one or more numbered candidate pairs, score how well "
+        "each candidate's skills match the task requirements on a scale of 0–100. "
         "Factors to consider:\n"
         "  • Direct skill overlap with the task domain (most important)\n"
         "  • Seniority and role relevance\n"
         "  • Any prior context mentioned about why they were suggested\n"
         "Be precise, consistent, and critical — don't inflate scores. "
-        "Return an integer score and a single concise sentence explaining it."
+        "Return exactly one entry per pair, with pair_index set to the pair's number, "
+        "an integer score, and a single concise sentence explaining it."
     ),
 )
 
@@ -99,29 +109,109 @@ def _retry_delay(exc: ModelHTTPError) -> int:
 
 # ── Scoring ────────────────────────────────────────────────────────────────────
 
-def score_pair(task: dict, member: dict, context_reason: str) -> SkillScore:
-    """Send one task-member pair to Gemini and return the structured score."""
+async def score_pairs(task: dict, pairs: list[tuple[dict, str]]) -> dict[int, SkillScore]:
+    """
+    Send all (member, context_reason) pairs for one task to Gemini in a single
+    call and return the structured scores keyed by 1-based pair index.
+    Pairs Gemini omits from its answer are simply absent from the result.
+    """
+    blocks = "\n\n".join(
+        f"Pair {i}:\n"
+        f"  Candidate     : {member['name']} ({member['role']})\n"
+        f"  Skills        : {', '.join(member['skills']) or 'none listed'}\n"
+        f"  Why suggested : {context_reason}"
+        for i, (member, context_reason) in enumerate(pairs, start=1)
+    )
     prompt = (
         f"Task title    : {task['title']}\n"
         f"Task priority : {task['priority']}\n"
         f"Task status   : {task['status']}\n\n"
-        f"Candidate     : {member['name']} ({member['role']})\n"
-        f"Skills        : {', '.join(member['skills']) or 'none listed'}\n\n"
-        f"Why suggested : {context_reason}\n\n"
-        "Score how well this candidate's skills match the task (0–100)."
+        f"{blocks}\n\n"
+        f"Score how well each of the {len(pairs)} candidates' skills match the task (0–100)."
     )
     for attempt in range(1, MAX_RETRIES + 1):
+        await gemini_bucket.acquire()
         try:
-            return agent.run_sync(prompt).output
+            results = (await agent.run(prompt)).output
+            return {r.pair_index: r for r in results if 1 <= r.pair_index <= len(pairs)}
         except ModelHTTPError as e:
             if e.status_code == 429 and attempt < MAX_RETRIES:
                 wait = _retry_delay(e)
                 print(f"    [rate-limited] waiting {wait}s before retry {attempt}...")
-                time.sleep(wait)
+                gemini_bucket.penalize(wait)  # the next acquire() waits it out
             else:
                 raise
 
 
+class _ScoreWriter:
+    """
+    Buffers writes of skill_scores.json: the file is rewritten once every
+    FLUSH_EVERY newly scored pairs and on exit, rather than after each pair.
+    Each write goes to a temp file that is then os.replace()d over the
+    output, so an interrupted run never leaves a truncated file behind.
+    """
+
+    def __init__(self, scores: dict) -> None:
+        self.scores = scores
+        self.dirty = 0
+
+    def record(self, task_id: str, member_id: str, result: SkillScore) -> None:
+        self.scores[task_id][member_id] = {
+            "skillMatchPct": result.skill_match_pct,
+            "contextReason": result.reasoning,
+        }
+        self.dirty += 1
+        if self.dirty >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.dirty:
+            return
+        tmp = OUTPUT_PATH.with_suffix(".json.tmp")
+        tmp.write_bytes(orjson.dumps(self.scores, option=orjson.OPT_INDENT_2))
+        os.replace(tmp, OUTPUT_PATH)
+        self.dirty = 0
+
+
+async def _score_task(
+    sem: asyncio.Semaphore,
+    task: dict,
+    pending: list[tuple[str, dict, str]],
+    writer: _ScoreWriter,
+) -> int:
+    """Score one task's pending (member_id, member, reason) batch into the writer."""
+    async with sem:
+        print(f"  [{task['id']}]  scoring {len(pending)} pair(s) in one call")
+        results = await score_pairs(task, [(member, reason) for _, member, reason in pending])
+
+    scored = 0
+    for i, (member_id, member, _) in enumerate(pending, start=1):
+        result = results.get(i)
+        if result is None:
+            print(f"    {task['id']} / {member_id}  {member['name']}: no score returned — will retry on next run")
+            continue
+
+        writer.record(task["id"], member_id, result)
+        scored += 1
+        print(f"    {task['id']} / {member_id}  {member['name']}")
+        print(f"      score  : {result.skill_match_pct}%")
+        print(f"      reason : {result.reasoning}")
+
+    return scored
+
+
+async def _score_all(batches: list[tuple[dict, list[tuple[str, dict, str]]]], writer: _ScoreWriter) -> int:
+    """Fan all task batches out concurrently; returns the number of pairs scored."""
+    sem = asyncio.Semaphore(MAX_CONCURRENT)
+    counts = await asyncio.gather(*(_score_task(sem, t, p, writer) for t, p in batches))
+    return sum(counts)
+
+
+def _exit_on_sigterm(signum, frame) -> None:
+    # Turn SIGTERM into SystemExit so main()'s finally block flushes scores
+    sys.exit(128 + signum)
+
+
 # ── Main ───────────────────────────────────────────────────────────────────────
 
 def main(dry_run: bool) -> None:
@@ -153,16 +243,18 @@ def main(dry_run: bool) -> None:
     # Load existing scores so the script can be safely interrupted and resumed
     scores: dict = {}
     if OUTPUT_PATH.exists():
-        scores = json.loads(OUTPUT_PATH.read_text(encoding="utf-8"))
+        scores = orjson.loads(OUTPUT_PATH.read_bytes())
         already = sum(len(v) for v in scores.values())
         print(f"Resuming — {already} pair(s) already scored.\n")
 
-    done = 0
     skipped = 0
+    batches: list[tuple[dict, list[tuple[str, dict, str]]]] = []
     for task in tasks:
         task_id = task["id"]
         scores.setdefault(task_id, {})
 
+        # Collect every not-yet-scored pair for this task into one batch
+        pending: list[tuple[str, dict, str]] = []
         for sugg in task["suggestions"]:
             member_id = sugg["memberId"]
 
@@ -175,29 +267,22 @@ def main(dry_run: bool) -> None:
                 print(f"  WARNING: {member_id} not found in teamMembers — skipping")
                 continue
 
-            print(f"  [{task_id} / {member_id}]  {member['name']}")
-            result = score_pair(task, member, sugg["contextReason"])
-
-            scores[task_id][member_id] = {
-                "skillMatchPct": result.skill_match_pct,
-                "contextReason": result.reasoning,
-            }
-            done += 1
-            print(f"    score  : {result.skill_match_pct}%")
-            print(f"    reason : {result.reasoning}")
+            pending.append((member_id, member, sugg["contextReason"]))
 
-            # Write after every pair so progress is never lost
-            OUTPUT_PATH.write_text(
-                json.dumps(scores, indent=2, ensure_ascii=False),
-                encoding="utf-8",
-            )
+        if pending:
+            batches.append((task, pending))
 
-            remaining = total_pairs - done - skipped
-            if remaining > 0:
-                time.sleep(INTER_CALL_DELAY)
+    calls = len(batches)
+    writer = _ScoreWriter(scores)
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
+    try:
+        done = asyncio.run(_score_all(batches, writer)) if batches else 0
+    finally:
+        # Progress is never lost — pending pairs are written even on Ctrl-C / SIGTERM
+        writer.flush()
 
     print(f"\n{'=' * 60}")
-    print(f"Done.  Scored: {done}  Skipped (already done): {skipped}")
+    print(f"Done.  Scored: {done}  Skipped (already done): {skipped}  Gemini calls: {calls}")
     print(f"Results → {OUTPUT_PATH}")
 
 
@@ -4,17 +4,31 @@ skill_pipeline.py
 DB-aware skill scoring pipeline.
 
 Scores a given task against all eligible team members using Gemini AI,
-then persists the ranked suggestions to the suggestions table.
+then persists the ranked suggestions to the suggestions table.  All candidates
+for a task are marshalled into one prompt, and tasks queued close together are
+scored together, so each pipeline run is a single Gemini request.  The call is
+awaited on the event loop (paced by the shared Gemini token bucket in
+rate_limit.py); DB work runs in a worker thread.
 
-Called from routers/tasks.py as a FastAPI BackgroundTask after:
+Candidates are pre-ranked by embedding similarity (embeddings.py) when
+sentence-transformers is installed, otherwise by keyword overlap.
+
+Queued with enqueue_pipeline() by routers/tasks.py and routers/chat.py after:
   - Task creation (always runs to pre-populate suggestions)
   - Task unassignment (re-runs to refresh candidates)
+and drained by pipeline_worker(), which main.py starts in the app lifespan.
 """
 
+import asyncio
+import heapq
 import os
+import threading
 import time
+from functools import lru_cache
+from operator import itemgetter
 
 from dotenv import load_dotenv
+from sqlalchemy import delete
 from sqlmodel import Session, select
 
 load_dotenv()
@@ -22,7 +36,9 @@ if os.getenv("GEMINI_API_KEY") and not os.getenv("GOOGLE_API_KEY"):
     os.environ["GOOGLE_API_KEY"] = os.environ["GEMINI_API_KEY"]
 
 from database import engine  # noqa: E402 – after env setup
+import embeddings  # noqa: E402
 from models import Suggestion, Task, TeamMember  # noqa: E402
+from rate_limit import gemini_bucket  # noqa: E402
 
 # ── Gemini setup (optional — falls back to heuristic scores if unavailable) ────
 
@@ -34,35 +50,51 @@ if _GEMINI_AVAILABLE:
     from pydantic_ai.exceptions import ModelHTTPError as _ModelHTTPError
 
     class _SkillScore(_PModel):
+        pair_index: int = _PField(description="1-based pair number from the prompt.")
         skill_match_pct: int = _PField(ge=0, le=100)
         reasoning: str
 
     _agent = _Agent(
         "google-gla:gemini-2.5-flash",
-        output_type=_SkillScore,
+        output_type=list[_SkillScore],
         system_prompt=(
             "You are a technical talent-matching system. "
-            "Given a task description and a team member's profile, score how well "
-            "the member's skills match the task requirements on a scale of 0–100. "
+            "Given one or more task descriptions, each followed by numbered candidate profiles, "
+            "score how well each candidate's skills match the requirements of the task they are "
+            "listed under, on a scale of 0–100. Pair numbers are unique across the whole prompt. "
             "Factors: direct skill overlap (most important), seniority, role relevance, "
             "and any manager notes that indicate the person's strengths or limitations. "
             "Be precise and critical — don't inflate scores. "
-            "Return an integer score and a single concise sentence explaining it."
+            "Return exactly one entry per pair, with pair_index set to the pair's number, "
+            "an integer score, and a single concise sentence explaining it."
         ),
     )
 
-INTER_CALL_DELAY = 4   # seconds between Gemini calls (free tier: 15 RPM)
 MAX_RETRIES = 3
 MAX_CANDIDATES = 6     # top members to score per pipeline run
+MEMBERS_CACHE_TTL = 60  # seconds a fetched team roster is reused across runs
+PIPELINE_BATCH_WINDOW = 0.5  # seconds the worker waits for more queued tasks after the first
+PIPELINE_BATCH_MAX = 4       # tasks scored together in one Gemini call
+PIPELINE_DRAIN_TIMEOUT = 30.0  # seconds shutdown waits for queued runs to finish
 
 
 # ── Helpers ────────────────────────────────────────────────────────────────────
 
-def _simple_relevance(task_title: str, project: str, skills: list[str], role: str) -> int:
+def _task_needles(task: Task) -> frozenset[str]:
+    """Significant (4+ letter) lowercase words from the task title and project."""
+    return frozenset(
+        w for w in (task.title + " " + task.project_name).lower().split() if len(w) > 3
+    )
+
+
+def _member_tokens(member: TeamMember) -> frozenset[str]:
+    """Lowercase words from the member's role and skills."""
+    return frozenset((member.role + " " + " ".join(member.skills or [])).lower().split())
+
+
+def _simple_relevance(needles: frozenset[str], tokens: frozenset[str]) -> int:
     """Word-overlap heuristic used to pre-filter candidates before calling Gemini."""
-    haystack = (role + " " + " ".join(skills)).lower()
-    needles = (task_title + " " + project).lower().split()
-    return sum(1 for n in needles if len(n) > 3 and n in haystack)
+    return len(needles & tokens)
 
 
 def _workload_pct(task_load_hours: float) -> float:
@@ -79,62 +111,167 @@ def _retry_delay(exc) -> int:
     return 65
 
 
-def _score_with_gemini(task: Task, member: TeamMember) -> tuple[int, str]:
-    """Call Gemini to score one pair. Returns (skill_match_pct, context_reason)."""
-    if not _GEMINI_AVAILABLE:
-        heuristic = _simple_relevance(
-            task.title, task.project_name, member.skills or [], member.role
-        )
+@lru_cache(maxsize=512)
+def _member_fragment(
+    name: str,
+    role: str,
+    skills: tuple[str, ...],
+    leave_status: str,
+    calendar_pct: float,
+    task_load_hours: float,
+    manager_notes: str,
+) -> str:
+    """
+    Candidate half of the scoring prompt.  Memoised on every field it renders,
+    so an edited member simply misses the cache and gets a fresh fragment.
+    """
+    notes_line = f"\n  Manager notes : {manager_notes}" if manager_notes else ""
+    return (
+        f"  Candidate     : {name} ({role})\n"
+        f"  Skills        : {', '.join(skills) or 'none listed'}\n"
+        f"  Availability  : {leave_status} · calendar {calendar_pct}%"
+        f" · {task_load_hours}h task load{notes_line}"
+    )
+
+
+async def _estimate_scores(task: Task, members: list[TeamMember]) -> list[tuple[int, str]]:
+    """Scores used when Gemini is not configured: embedding similarity, else keyword overlap."""
+    if embeddings.EMBEDDINGS_AVAILABLE:
+        sims = await asyncio.to_thread(embeddings.similarities, task, members)
+        return [
+            (max(0, min(100, round(float(sim) * 100))),
+             "Gemini not configured — score estimated from skill-profile similarity.")
+            for sim in sims
+        ]
+
+    needles = _task_needles(task)
+    results = []
+    for member in members:
+        heuristic = _simple_relevance(needles, _member_tokens(member))
         pct = min(90, 40 + heuristic * 10)
-        return pct, "Gemini not configured — score estimated from skill keyword overlap."
+        results.append(
+            (pct, "Gemini not configured — score estimated from skill keyword overlap.")
+        )
+    return results
 
-    notes_line = (
-        f"\nManager notes : {member.manager_notes}"
-        if member.manager_notes else ""
-    )
+
+async def _score_with_gemini(
+    jobs: list[tuple[Task, list[TeamMember]]],
+) -> list[list[tuple[int, str]]]:
+    """
+    Score the candidates of one or more tasks in a single Gemini call.
+    Pairs are numbered across the whole prompt, each listed under its task.
+    Returns (skill_match_pct, context_reason) per member, per job, in input order.
+    """
+    if not _GEMINI_AVAILABLE:
+        return [await _estimate_scores(task, members) for task, members in jobs]
+
+    sections = []
+    n_pairs = 0
+    for task, members in jobs:
+        if not members:
+            continue
+        blocks = [
+            f"Pair {n_pairs + i}:\n" + _member_fragment(
+                m.name, m.role, tuple(m.skills or []), m.leave_status,
+                m.calendar_pct, m.task_load_hours, m.manager_notes,
+            )
+            for i, m in enumerate(members, start=1)
+        ]
+        n_pairs += len(members)
+        sections.append(
+            f"Task title    : {task.title}\n"
+            f"Task priority : {task.priority}\n"
+            f"Project       : {task.project_name}\n\n"
+            + "\n\n".join(blocks)
+        )
+    if not n_pairs:
+        return [[] for _ in jobs]
 
     prompt = (
-        f"Task title    : {task.title}\n"
-        f"Task priority : {task.priority}\n"
-        f"Project       : {task.project_name}\n\n"
-        f"Candidate     : {member.name} ({member.role})\n"
-        f"Skills        : {', '.join(member.skills or []) or 'none listed'}\n"
-        f"Availability  : {member.leave_status} · calendar {member.calendar_pct}%"
-        f" · {member.task_load_hours}h task load{notes_line}\n\n"
-        "Score how well this candidate's skills match the task (0–100)."
+        "\n\n---\n\n".join(sections)
+        + f"\n\nScore how well each of the {n_pairs} candidates' skills "
+        "match the task they are listed under (0–100)."
     )
 
     for attempt in range(1, MAX_RETRIES + 1):
+        await gemini_bucket.acquire()
         try:
-            result = _agent.run_sync(prompt).output
-            return result.skill_match_pct, result.reasoning
+            by_index = {r.pair_index: r for r in (await _agent.run(prompt)).output}
+            break
         except _ModelHTTPError as e:
             if e.status_code == 429 and attempt < MAX_RETRIES:
                 wait = _retry_delay(e)
                 print(f"[skill_pipeline] rate-limited, waiting {wait}s (attempt {attempt})…")
-                time.sleep(wait)
+                gemini_bucket.penalize(wait)  # the next acquire() waits it out
             else:
                 raise
-
-    return 50, "Scoring failed after retries — default score applied."
-
-
-# ── Public entry point ─────────────────────────────────────────────────────────
-
-def run_pipeline_for_task(task_id: str) -> None:
-    """
-    Score all eligible members against the given task and persist suggestions.
-    Creates its own DB session — safe to call from a background thread.
-    """
-    print(f"[skill_pipeline] Starting pipeline for task {task_id} …")
-
+    else:
+        by_index = {}
+
+    results = []
+    index = 1
+    for _, members in jobs:
+        job_results = []
+        for _ in members:
+            r = by_index.get(index)
+            job_results.append(
+                (r.skill_match_pct, r.reasoning) if r
+                else (50, "No score returned for this candidate — default score applied.")
+            )
+            index += 1
+        results.append(job_results)
+    return results
+
+
+# ── Team roster cache ──────────────────────────────────────────────────────────
+# The roster changes rarely but the pipeline runs on every task create/unassign,
+# so the last fetch is reused for MEMBERS_CACHE_TTL seconds.  Routers call
+# invalidate_members_cache() after any write to team_members.
+
+_members_cache: tuple[float, list[TeamMember]] | None = None
+_members_generation = 0
+_members_lock = threading.Lock()
+
+
+def invalidate_members_cache() -> None:
+    """Drop the cached roster so the next pipeline run re-reads team_members."""
+    global _members_cache, _members_generation
+    with _members_lock:
+        _members_cache = None
+        _members_generation += 1
+
+
+def _cached_members(db: Session) -> list[TeamMember]:
+    """Return all team members, served from the TTL cache when fresh."""
+    global _members_cache
+    with _members_lock:
+        cached, generation = _members_cache, _members_generation
+    if cached and time.monotonic() - cached[0] < MEMBERS_CACHE_TTL:
+        return cached[1]
+
+    members = list(db.exec(select(TeamMember)).all())
+    # Detach so the rows keep their loaded state after this session closes
+    for m in members:
+        db.expunge(m)
+
+    with _members_lock:
+        # Don't store a roster that an invalidation raced past
+        if generation == _members_generation:
+            _members_cache = (time.monotonic(), members)
+    return members
+
+
+# ── DB steps (run in a worker thread) ──────────────────────────────────────────
+
+def _load_candidates(task_id: str) -> tuple[Task, list[TeamMember]] | None:
+    """Load the task and its top MAX_CANDIDATES eligible members, detached from the session."""
     with Session(engine) as db:
         task = db.get(Task, task_id)
         if not task:
-            print(f"[skill_pipeline] Task {task_id} not found — aborting.")
-            return
+            return None
 
-        all_members = db.exec(select(TeamMember)).all()
+        all_members = _cached_members(db)
 
         # Exclude current assignee and OOO members
         candidates = [
@@ -142,49 +279,158 @@ def run_pipeline_for_task(task_id: str) -> None:
             if m.id != task.assignee_id and m.leave_status != "ooo"
         ]
 
-        # Pre-rank by keyword heuristic, keep top MAX_CANDIDATES
-        candidates.sort(
-            key=lambda m: _simple_relevance(
-                task.title, task.project_name, m.skills or [], m.role
-            ),
-            reverse=True,
-        )
-        candidates = candidates[:MAX_CANDIDATES]
+        if embeddings.EMBEDDINGS_AVAILABLE:
+            return task, embeddings.top_members(task, candidates, MAX_CANDIDATES)
 
-        print(f"[skill_pipeline] Scoring {len(candidates)} candidates…")
-
-        # Delete existing suggestions for this task
-        for s in db.exec(select(Suggestion).where(Suggestion.task_id == task_id)).all():
-            db.delete(s)
-        db.commit()
-
-        # Score each candidate
-        scored: list[tuple[int, TeamMember, float, str]] = []
-        for i, member in enumerate(candidates):
-            try:
-                pct, reason = _score_with_gemini(task, member)
-            except Exception as exc:
-                print(f"[skill_pipeline] Error scoring {member.id}: {exc}")
-                pct, reason = 50, "Scoring error — default score applied."
+        # Pre-rank by keyword heuristic, keep top MAX_CANDIDATES
+        needles = _task_needles(task)
+        scored = [(_simple_relevance(needles, _member_tokens(m)), m) for m in candidates]
+        top = heapq.nlargest(MAX_CANDIDATES, scored, key=itemgetter(0))
+        return task, [m for _, m in top]
 
-            workload = _workload_pct(member.task_load_hours)
-            scored.append((pct, member, workload, reason))
-            print(f"[skill_pipeline]   {member.name}: {pct}%")
 
-            if i < len(candidates) - 1 and _GEMINI_AVAILABLE:
-                time.sleep(INTER_CALL_DELAY)
+def _save_suggestions(task_id: str, scored: list[tuple[int, TeamMember, float, str]]) -> None:
+    """Replace the task's suggestions with the scored candidates, ranked by skill match."""
+    with Session(engine) as db:
+        # Delete existing suggestions for this task in one statement
+        db.execute(delete(Suggestion).where(Suggestion.task_id == task_id))
 
         # Sort by skill_match_pct descending, assign rank
         scored.sort(key=lambda x: x[0], reverse=True)
-        for rank, (pct, member, workload, reason) in enumerate(scored):
-            db.add(Suggestion(
+        db.add_all([
+            Suggestion(
                 task_id=task_id,
                 member_id=member.id,
                 skill_match_pct=float(pct),
                 workload_pct=workload,
                 context_reason=reason,
                 rank=rank,
-            ))
+            )
+            for rank, (pct, member, workload, reason) in enumerate(scored)
+        ])
 
         db.commit()
-        print(f"[skill_pipeline] Done — {len(scored)} suggestions saved for {task_id}.")
+
+
+# ── Public entry points ────────────────────────────────────────────────────────
+
+async def run_pipeline_for_tasks(task_ids: list[str]) -> None:
+    """
+    Score all eligible members against each given task — every task's
+    candidates in the same Gemini call — and persist the suggestions.
+    Creates its own DB sessions (in worker threads).
+    """
+    jobs: list[tuple[Task, list[TeamMember]]] = []
+    for task_id in task_ids:
+        print(f"[skill_pipeline] Starting pipeline for task {task_id} …")
+        loaded = await asyncio.to_thread(_load_candidates, task_id)
+        if loaded is None:
+            print(f"[skill_pipeline] Task {task_id} not found — aborting.")
+            continue
+        jobs.append(loaded)
+    if not jobs:
+        return
+
+    print(f"[skill_pipeline] Scoring {sum(len(c) for _, c in jobs)} candidates "
+          f"across {len(jobs)} task(s)…")
+
+    # Score all candidates of all tasks in a single batched call
+    try:
+        results = await _score_with_gemini(jobs)
+    except Exception as exc:
+        print(f"[skill_pipeline] Error scoring candidates for "
+              f"{', '.join(t.id for t, _ in jobs)}: {exc}")
+        results = [[(50, "Scoring error — default score applied.")] * len(c) for _, c in jobs]
+
+    for (task, candidates), task_results in zip(jobs, results):
+        scored: list[tuple[int, TeamMember, float, str]] = []
+        for member, (pct, reason) in zip(candidates, task_results):
+            workload = _workload_pct(member.task_load_hours)
+            scored.append((pct, member, workload, reason))
+            print(f"[skill_pipeline]   {task.id} · {member.name}: {pct}%")
+
+        await asyncio.to_thread(_save_suggestions, task.id, scored)
+        print(f"[skill_pipeline] Done — {len(scored)} suggestions saved for {task.id}.")
+
+
+async def run_pipeline_for_task(task_id: str) -> None:
+    """Run the pipeline for a single task — safe to run with asyncio.run()."""
+    await run_pipeline_for_tasks([task_id])
+
+
+# ── Pipeline queue ─────────────────────────────────────────────────────────────
+# Request handlers call enqueue_pipeline() instead of running the pipeline
+# themselves.  A single worker, started from the app lifespan, drains the queue:
+# after the first task id arrives it waits PIPELINE_BATCH_WINDOW for a burst to
+# accumulate, then scores up to PIPELINE_BATCH_MAX tasks with one Gemini call.
+# A task id that is already waiting in the queue is not queued twice.  On
+# shutdown the lifespan calls drain_pipeline() before cancelling the worker;
+# any runs still queued after that are logged as discarded.
+
+_queue: asyncio.Queue[str] | None = None
+_queue_loop: asyncio.AbstractEventLoop | None = None
+_queued: set[str] = set()
+
+
+def _put(task_id: str) -> None:
+    if _queue is not None and task_id not in _queued:
+        _queued.add(task_id)
+        _queue.put_nowait(task_id)
+
+
+def enqueue_pipeline(task_id: str) -> None:
+    """
+    Schedule a pipeline run for the task.  Safe to call from any thread.
+    Without a running worker (e.g. outside the API server) the pipeline runs
+    on its own event loop in a background thread instead.
+    """
+    loop = _queue_loop
+    if loop is None:
+        threading.Thread(
+            target=asyncio.run, args=(run_pipeline_for_task(task_id),), daemon=True
+        ).start()
+        return
+    loop.call_soon_threadsafe(_put, task_id)
+
+
+async def pipeline_worker() -> None:
+    """Drain the pipeline queue until cancelled.  Run as a task from the app lifespan."""
+    global _queue, _queue_loop
+    loop = asyncio.get_running_loop()
+    _queue, _queue_loop = asyncio.Queue(), loop
+    try:
+        while True:
+            batch = [await _queue.get()]
+            deadline = loop.time() + PIPELINE_BATCH_WINDOW
+            while len(batch) < PIPELINE_BATCH_MAX:
+                try:
+                    batch.append(await asyncio.wait_for(_queue.get(), deadline - loop.time()))
+                except TimeoutError:
+                    break
+            # Ids enqueued from here on get a fresh run after this one
+            _queued.difference_update(batch)
+            try:
+                await run_pipeline_for_tasks(batch)
+            except asyncio.CancelledError:
+                print(f"[skill_pipeline] Shutdown interrupted the pipeline run for {', '.join(batch)}")
+                raise
+            except Exception as exc:
+                print(f"[skill_pipeline] Pipeline run failed for {', '.join(batch)}: {exc}")
+            finally:
+                for _ in batch:
+                    _queue.task_done()
+    finally:
+        if _queued:
+            print(f"[skill_pipeline] Shutdown discarded queued pipeline runs for {', '.join(sorted(_queued))}")
+        _queue = _queue_loop = None
+        _queued.clear()
+
+
+async def drain_pipeline(timeout: float = PIPELINE_DRAIN_TIMEOUT) -> None:
+    """Wait up to `timeout` seconds for every queued pipeline run to finish."""
+    if _queue is None:
+        return
+    try:
+        await asyncio.wait_for(_queue.join(), timeout)
+    except TimeoutError:
+        pass  # pipeline_worker logs whatever is left once it is cancelled
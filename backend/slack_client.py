@@ -0,0 +1,84 @@
+"""
+slack_client.py
+---------------
+Shared Slack clients for the API server and the CLI.
+
+get_async_slack_client() is what the time-off parser uses: an AsyncWebClient
+over an aiohttp session whose connection pool keeps TLS connections to Slack
+alive, so a users.list sweep or a run of conversations.history pages pays
+for one handshake rather than one per call.  aiohttp sessions belong to the
+event loop they were created on, so there is one client per loop — for the
+API server that is a single long-lived client, closed on shutdown.
+
+get_slack_client() is the sync WebClient for one-off calls (DM pings, the
+CLI's channel lookup).  It sends each request through urllib, which opens a
+new connection per call and — when no SSL context is given — builds a fresh
+context (re-reading the CA bundle) every time; building it once with a shared
+SSL context keeps that per-call setup down to the handshake itself.
+"""
+
+import asyncio
+import os
+import ssl
+import weakref
+from functools import lru_cache
+
+import aiohttp
+from dotenv import load_dotenv
+from slack_sdk import WebClient
+from slack_sdk.web.async_client import AsyncWebClient
+
+load_dotenv()
+
+SLACK_TIMEOUT = 10            # seconds per Slack API request
+SLACK_POOL_SIZE = 20          # open connections per async client
+SLACK_KEEPALIVE_TIMEOUT = 60  # seconds an idle pooled connection is kept
+
+
+@lru_cache(maxsize=1)
+def _ssl_context() -> ssl.SSLContext:
+    return ssl.create_default_context()
+
+
+@lru_cache(maxsize=1)
+def get_slack_client() -> WebClient:
+    """The shared WebClient, created on first use."""
+    return WebClient(
+        token=os.getenv("SLACK_BOT_TOKEN"),
+        timeout=SLACK_TIMEOUT,
+        ssl=_ssl_context(),
+    )
+
+
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncWebClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_slack_client() -> AsyncWebClient:
+    """
+    The running event loop's AsyncWebClient, created on first use.  Must be
+    called from inside a coroutine.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        connector = aiohttp.TCPConnector(
+            limit=SLACK_POOL_SIZE,
+            keepalive_timeout=SLACK_KEEPALIVE_TIMEOUT,
+            ssl=_ssl_context(),
+        )
+        client = AsyncWebClient(
+            token=os.getenv("SLACK_BOT_TOKEN"),
+            timeout=SLACK_TIMEOUT,
+            session=aiohttp.ClientSession(connector=connector),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def close_async_slack_client() -> None:
+    """Close the running loop's AsyncWebClient session, if one was created."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.session.close()
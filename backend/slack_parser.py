@@ -3,14 +3,24 @@ Core Slack time-off parsing logic.
 Shared between the CLI (fetch_timeoff.py) and the FastAPI server (main.py).
 """
 
+import asyncio
+import hashlib
 import os
+import random
 import re
+import sqlite3
+import tempfile
+import threading
 import time
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Optional
+from operator import itemgetter
+from pathlib import Path
+from typing import AsyncIterator, Generic, Optional, TypeVar
 
+import msgspec
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from pydantic_ai import Agent
 
 # Load env and map GEMINI_API_KEY → GOOGLE_API_KEY before the Agent is created
@@ -18,17 +28,56 @@ load_dotenv()
 if os.getenv("GEMINI_API_KEY") and not os.getenv("GOOGLE_API_KEY"):
     os.environ["GOOGLE_API_KEY"] = os.environ["GEMINI_API_KEY"]
 from pydantic_ai.exceptions import ModelHTTPError
-from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_client import AsyncWebClient
+
+from rate_limit import gemini_bucket
+from slack_client import close_async_slack_client, get_async_slack_client
 
 # ── Config ─────────────────────────────────────────────────────────────────────
 GEMINI_MODEL = "google-gla:gemini-2.5-flash"
-INTER_CALL_DELAY_SECONDS = 4  # stay safely under 15 RPM free-tier limit
 MAX_RETRIES = 4
+RETRYABLE_STATUS = {429, 500, 503}  # quota and transient server errors; 4xx otherwise is final
+BACKOFF_INITIAL = 2                 # seconds before the first retry, doubling per attempt
+BACKOFF_MAX = 65
+BATCH_SIZE = 15              # messages sent to Gemini per call
+MAX_CONCURRENT_BATCHES = 4   # batches in flight at once; the RPM cap is gemini_bucket's job
+BATCH_WINDOW = 0.5           # seconds a partial batch waits for more messages
+SLACK_PAGE_SIZE = 200        # conversations.history page size (Slack's recommended max)
+USER_CACHE_TTL = 1800        # seconds a resolved display name is trusted
+USER_CACHE_MAX_SIZE = 10_000
+# Resolved display names are also written to SQLite here, so a reload or
+# worker restart starts with a warm cache instead of re-listing the workspace
+SLACK_CACHE_DIR = Path(os.getenv("SLACK_CACHE_DIR", Path(tempfile.gettempdir()) / "slack_cache"))
+PARSE_CACHE_TTL = 7 * 24 * 3600  # seconds a parsed message is remembered
+PARSE_CACHE_MAX_SIZE = 5_000
+
+# Cheap pre-classifier: a message matching none of these is never sent to
+# Gemini.  Kept deliberately broad — a false positive only costs a slot in a
+# batch, a false negative loses a time-off announcement.
+_TIMEOFF_HINT = re.compile(
+    r"\b(?:"
+    r"pto|ooo|out of (?:the )?office|vacation|vacay|holidays?|leave|sick|ill|unwell|"
+    r"time off|days? off|off (?:on|from|until|till|today|tomorrow|next|this|for)|"
+    r"out (?:on|from|until|till|today|tomorrow|next|this|for|sick)|"
+    r"away|back (?:on|in|from)|returning|wfh|working from home|"
+    r"bereavement|funeral|jury duty|parental|maternity|paternity|medical|doctor|dentist|"
+    r"appointment|travel(?:l?ing)?|trip|conference|offsite|"
+    r"(?:off|out)\s+(?:mon|tue|wed|thu|fri|sat|sun)\w*|(?:mon|tue|wed|thu|fri)\w*\s+off|"
+    r"(?:off|out)\s+\d{1,2}/\d{1,2}|taking .* off|"
+    r"unavailable|not available|not (?:in|around|working)|won['’]?t be (?:in|around|online)|"
+    r"absent|half[- ]day|ooto|offline|annual leave"
+    r")\b",
+    re.IGNORECASE,
+)
+
 
 # ── Pydantic model returned by Gemini ─────────────────────────────────────────
 class TimeOffDetails(BaseModel):
     """Structured output from Gemini for a single Slack message."""
+    # Immutable once validated: parsed results are shared through _parse_cache
+    model_config = ConfigDict(frozen=True)
+
     is_time_off_request: bool
 
     person_username: Optional[str] = None
@@ -51,9 +100,25 @@ class TimeOffDetails(BaseModel):
     """Any other relevant details."""
 
 
+class IndexedTimeOffDetails(TimeOffDetails):
+    """TimeOffDetails for one message of a batched prompt."""
+    message_index: int
+    """The N of the '--- MSG N ---' block this entry describes."""
+
+
+class BatchResult(BaseModel):
+    """Structured output from Gemini for a batch of Slack messages."""
+    items: list[IndexedTimeOffDetails]
+
+
 # ── API response model ─────────────────────────────────────────────────────────
-class TimeOffEntry(BaseModel):
-    """A single detected time-off entry returned by the API."""
+class TimeOffEntry(msgspec.Struct, frozen=True):
+    """
+    A single detected time-off entry returned by the API.
+    A msgspec Struct rather than a Pydantic model: entries are built once per
+    detected message and serialised straight to JSON with msgspec.json.encode.
+    Frozen, like TimeOffDetails — entries are read-only once built.
+    """
     sent_at: str
     sender: str
     message: str
@@ -66,13 +131,14 @@ class TimeOffEntry(BaseModel):
 
 
 # ── Pydantic AI agent ──────────────────────────────────────────────────────────
-agent = Agent(
+batch_agent = Agent(
     GEMINI_MODEL,
-    output_type=TimeOffDetails,
+    output_type=BatchResult,
     system_prompt=(
         "You are an HR assistant that reads Slack messages and extracts time-off information. "
-        "You will be given the message text, the display name of the sender, and the exact "
-        "date and time the message was sent. "
+        "You will be given several messages, each introduced by a '--- MSG N ---' separator "
+        "and followed by the display name of its sender and the exact date and time it was sent. "
+        "Treat every message independently. "
         "Use the message sent date to resolve any partial or relative dates to full dates "
         "including the correct year (e.g. '2/21' sent in 2026 → '2/21/2026', "
         "'next Monday' sent on 2026-02-21 → '2/23/2026'). "
@@ -84,242 +150,727 @@ agent = Agent(
         "Always return plain text names (e.g. 'Alex Chen') for person_username and coverage_username — "
         "never return Slack user IDs or <@...> tokens. "
         "If the message is not about time off (e.g. general chat, a question, a system event), "
-        "set is_time_off_request to false and leave all other fields null."
+        "set is_time_off_request to false and leave all other fields null. "
+        "Return exactly one item per message, in order, with message_index set to its N."
     ),
 )
 
+# One message's block in a batched prompt, filled with str.format_map
+_MESSAGE_BLOCK_TEMPLATE = (
+    "--- MSG {index} ---\n"
+    "Sender display name: {sender}\n"
+    "Message sent at    : {sent} (year: {year})\n\n"
+    "Message:\n{text}"
+)
+
 # ── User resolution ────────────────────────────────────────────────────────────
-_user_cache: dict[str, str] = {}
+_V = TypeVar("_V")
 
 
-def resolve_user(client: WebClient, user_id: str) -> str:
-    """Return the best display name for a Slack user ID, with in-memory cache."""
-    if user_id in _user_cache:
-        return _user_cache[user_id]
+class _TTLCache(Generic[_V]):
+    """
+    Thread-safe cache keyed by str whose entries expire `ttl` seconds after they
+    were stored.  An insert that finds the cache full first sweeps expired
+    entries and, if it is still full, drops the oldest half.
+    """
+
+    def __init__(self, ttl: float, maxsize: int) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[_V, float]] = OrderedDict()  # key → (value, expiry)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[_V]:
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            if hit[1] <= time.monotonic():
+                del self._data[key]
+                return None
+            return hit[0]
+
+    def update(self, items: dict[str, _V], ttl: Optional[float] = None) -> None:
+        with self._lock:
+            expiry = time.monotonic() + (self.ttl if ttl is None else ttl)
+            for key, value in items.items():
+                # Re-insert at the end so the dict stays ordered by expiry
+                self._data.pop(key, None)
+                if len(self._data) >= self.maxsize:
+                    self._evict()
+                self._data[key] = (value, expiry)
+
+    def __setitem__(self, key: str, value: _V) -> None:
+        self.update({key: value})
+
+    def _evict(self) -> None:
+        # Caller holds self._lock.  Entries are in expiry order, so expired
+        # ones are all at the front.
+        now = time.monotonic()
+        while self._data and next(iter(self._data.values()))[1] <= now:
+            self._data.popitem(last=False)
+        if len(self._data) >= self.maxsize:
+            for _ in range(len(self._data) // 2):
+                self._data.popitem(last=False)
+
+
+_user_cache: _TTLCache[str] = _TTLCache(ttl=USER_CACHE_TTL, maxsize=USER_CACHE_MAX_SIZE)
+_MENTION_RE: re.Pattern[str] = re.compile(r"<@([A-Z0-9]+)>")
+
+# On-disk copy of _user_cache.  Entries carry a wall-clock expiry so they
+# keep their remaining TTL across restarts.  Persistence is best-effort: any
+# SQLite error disables it and the in-memory cache carries on alone.
+_user_db: Optional[sqlite3.Connection] = None
+_user_db_lock = threading.Lock()
+_user_db_loaded = False
+
+
+def _open_user_db() -> Optional[sqlite3.Connection]:
+    """Caller holds _user_db_lock."""
+    global _user_db
+    if _user_db is None:
+        try:
+            SLACK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            _user_db = sqlite3.connect(SLACK_CACHE_DIR / "users.sqlite3", check_same_thread=False)
+            _user_db.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                "user_id TEXT PRIMARY KEY, name TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+        except (OSError, sqlite3.Error) as exc:
+            print(f"[slack_parser] User cache not persisted ({exc})")
+            _user_db = None
+    return _user_db
+
+
+def load_user_cache() -> None:
+    """
+    Re-hydrate _user_cache from SQLite, dropping expired rows.  Runs once per
+    process — on startup from main.py, otherwise on the first user lookup.
+    """
+    global _user_db_loaded
+    with _user_db_lock:
+        if _user_db_loaded:
+            return
+        _user_db_loaded = True
+        db = _open_user_db()
+        if db is None:
+            return
+        now = time.time()
+        try:
+            with db:
+                db.execute("DELETE FROM users WHERE expires_at <= ?", (now,))
+            rows = db.execute(
+                "SELECT user_id, name, expires_at FROM users ORDER BY expires_at"
+            ).fetchall()
+        except sqlite3.Error as exc:
+            print(f"[slack_parser] Could not read user cache ({exc})")
+            return
+    # Ordered by expiry, so _user_cache stays in expiry order too
+    for user_id, name, expires_at in rows:
+        _user_cache.update({user_id: name}, ttl=expires_at - now)
+
+
+def get_user(user_id: str) -> Optional[str]:
+    """Cached display name for a Slack user ID, or None."""
+    if not _user_db_loaded:
+        load_user_cache()
+    return _user_cache.get(user_id)
+
+
+def _persist_users(names: dict[str, str]) -> None:
+    """
+    Write display names to SQLite.  Blocking (a committed transaction), so
+    async callers run it via asyncio.to_thread — see _ensure_users.
+    """
+    expires_at = time.time() + USER_CACHE_TTL
+    with _user_db_lock:
+        db = _open_user_db()
+        if db is None:
+            return
+        try:
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO users (user_id, name, expires_at) VALUES (?, ?, ?)",
+                    [(uid, name, expires_at) for uid, name in names.items()],
+                )
+        except sqlite3.Error as exc:
+            print(f"[slack_parser] Could not write user cache ({exc})")
+
+
+def _display_name(user: dict) -> str:
+    """Best display name from a Slack user object (users.info / users.list)."""
+    profile = user.get("profile", {})
+    return (
+        profile.get("display_name")
+        or profile.get("real_name")
+        or user.get("name")
+        or user["id"]
+    )
+
+
+async def resolve_user(client: AsyncWebClient, user_id: str) -> str:
+    """
+    Return the best display name for a Slack user ID, via the TTL cache.
+    Misses are cached in memory only; _ensure_users persists them.
+    """
+    cached = get_user(user_id)
+    if cached is not None:
+        return cached
     try:
-        resp = client.users_info(user=user_id)
-        profile = resp["user"]["profile"]
-        name = (
-            profile.get("display_name")
-            or profile.get("real_name")
-            or resp["user"].get("name")
-            or user_id
-        )
+        resp = await client.users_info(user=user_id)
+        name = _display_name({"id": user_id, **resp["user"]})
     except SlackApiError:
         name = user_id
     _user_cache[user_id] = name
     return name
 
 
-def resolve_mentions(text: str, client: WebClient) -> str:
-    """Replace <@USERID> Slack mention tokens with @display_name."""
+async def warm_user_cache(client: AsyncWebClient) -> dict[str, str]:
+    """
+    Fill the in-memory user cache from users.list, 200 members per page, so
+    the resolve_user calls that follow are dict hits, and return the names
+    fetched.  Ids it doesn't cover (bots, deactivated users) still fall back
+    to users.info.
+    """
+    names: dict[str, str] = {}
+    cursor = None
+    try:
+        while True:
+            resp = await client.users_list(limit=200, cursor=cursor)
+            page = {m["id"]: _display_name(m) for m in resp.get("members", [])}
+            _user_cache.update(page)
+            names.update(page)
+            cursor = resp.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                break
+    except SlackApiError:
+        pass  # e.g. rate-limited — resolve_user falls back to per-id lookups
+    return names
+
+
+async def _ensure_users(client: AsyncWebClient, user_ids: set[str]) -> None:
+    """
+    Make sure every given id is cached: one users.list sweep if any is
+    missing, then users.info for whatever the sweep didn't cover.  Everything
+    fetched is written to SQLite in one transaction, off the event loop.
+    """
+    if all(get_user(uid) is not None for uid in user_ids):
+        return
+    names = await warm_user_cache(client)
+    for uid in user_ids:
+        if get_user(uid) is None:
+            names[uid] = await resolve_user(client, uid)
+    if names:
+        await asyncio.to_thread(_persist_users, names)
+
+
+def _mentioned_users(texts: list[str]) -> set[str]:
+    """Every user id mentioned as <@USERID> in the given texts."""
+    return set(_MENTION_RE.findall("\n".join(texts)))
+
+
+def _resolve_cached_mentions(text: str) -> str:
+    """
+    Replace <@USERID> Slack mention tokens with @display_name, from the user
+    cache only — an id that isn't cached is left as-is.  Callers fill the
+    cache up front with _ensure_users, so this can run on a whole batched
+    prompt in a single regex pass.
+    """
     def replacer(match: re.Match) -> str:
-        return f"@{resolve_user(client, match.group(1))}"
-    return re.sub(r"<@([A-Z0-9]+)>", replacer, text)
+        name = get_user(match.group(1))
+        return f"@{name}" if name is not None else match.group(0)
+    return _MENTION_RE.sub(replacer, text)
 
 
 # ── Helpers ────────────────────────────────────────────────────────────────────
+def _strip_at(s: str) -> str:
+    """Drop a single leading '@' (unlike lstrip, '@@alice' → '@alice')."""
+    return s[1:] if s.startswith("@") else s
+
+
 def _clean_user_ref(s: str) -> str:
     """
     Normalise a Slack user reference extracted from Gemini output.
     Strips the leading '@' and any '|displayname' suffix so the result is
     a bare user ID (e.g. 'U08ABC123') or a plain name ('Jordan Kim').
     """
-    return s.lstrip("@").split("|")[0].strip()
+    return _strip_at(s).split("|", 1)[0].strip()
 
 
 def ts_to_datetime(ts: str) -> datetime:
     return datetime.fromtimestamp(float(ts), tz=timezone.utc)
 
 
-def format_datetime(dt: datetime) -> str:
-    return dt.strftime("%Y-%m-%d %H:%M:%S UTC")
+def _format_ts(ts: str) -> tuple[str, int]:
+    """
+    A Slack ts as the prompt's 'YYYY-MM-DD HH:MM:SS UTC' string plus its
+    year, via time.gmtime rather than a tz-aware datetime.
+    """
+    t = time.gmtime(float(ts))
+    return time.strftime("%Y-%m-%d %H:%M:%S UTC", t), t.tm_year
+
+
+_RETRY_DELAY_RE = re.compile(r"(\d+)")  # leading whole seconds of e.g. "37s" / "12.5s"
 
 
-def _retry_delay_from_error(exc: ModelHTTPError) -> int:
+def _retry_delay_from_error(exc: ModelHTTPError, default: int = 65) -> int:
     """Parse the suggested retry-after seconds from a Gemini 429 body."""
-    try:
-        for d in exc.body.get("error", {}).get("details", []):
-            if "RetryInfo" in d.get("@type", ""):
-                return int(d.get("retryDelay", "60s").rstrip("s")) + 5
-    except Exception:
-        pass
-    return 65
+    body = exc.body if isinstance(exc.body, dict) else {}
+    error = body.get("error")
+    # Gemini bodies vary ("error" may be a bare status string, details may
+    # hold non-dict entries); anything unexpected falls back to `default`
+    details = error.get("details") if isinstance(error, dict) else None
+    if not isinstance(details, list):
+        details = []
+    retry_delay = next(
+        (
+            d.get("retryDelay", "60s") for d in details
+            if isinstance(d, dict) and str(d.get("@type", "")).endswith("RetryInfo")
+        ),
+        None,
+    )
+    match = _RETRY_DELAY_RE.match(retry_delay) if isinstance(retry_delay, str) else None
+    return int(match.group(1)) + 5 if match else default
+
+
+def _backoff_delay(exc: ModelHTTPError, attempt: int) -> float:
+    """
+    Seconds to wait before retry `attempt` (1-based): exponential backoff
+    from BACKOFF_INITIAL capped at BACKOFF_MAX, plus up to 1 s of jitter so
+    concurrent batches don't retry in lockstep.  A longer RetryInfo hint in
+    a 429 body wins.
+    """
+    delay = min(BACKOFF_MAX, BACKOFF_INITIAL * 2 ** (attempt - 1)) + random.random()
+    if exc.status_code == 429:
+        delay = max(delay, _retry_delay_from_error(exc, default=0))
+    return delay
+
+
+def _should_retry(exc: ModelHTTPError, attempt: int) -> bool:
+    return exc.status_code in RETRYABLE_STATUS and attempt < MAX_RETRIES
 
 
 # ── Core parsing ───────────────────────────────────────────────────────────────
-def parse_message(text: str, sender_name: str, sent_at: datetime) -> TimeOffDetails:
-    """Run a single message through Gemini, retrying on 429."""
-    prompt = (
-        f"Sender display name: {sender_name}\n"
-        f"Message sent at    : {format_datetime(sent_at)} (year: {sent_at.year})\n\n"
-        f"Message:\n{text}"
-    )
+# Parsed results are memoised by message content, so re-syncing the same
+# window — or a channel full of identical reminder posts — doesn't spend
+# Gemini calls on messages already seen.  The key includes the sender (first-
+# person messages resolve to them) and the sent date (relative dates like
+# "tomorrow" resolve against it).
+_parse_cache: _TTLCache[TimeOffDetails] = _TTLCache(ttl=PARSE_CACHE_TTL, maxsize=PARSE_CACHE_MAX_SIZE)
+
+# Stand-in for a message the model returned no item for; never cached
+_NOT_RETURNED = TimeOffDetails(is_time_off_request=False)
+
+
+def _parse_key(text: str, sender_name: str, ts: str) -> str:
+    sent_date = _format_ts(ts)[0][:10]
+    return hashlib.blake2b(
+        f"{sender_name}\0{sent_date}\0{text}".encode(), digest_size=16
+    ).hexdigest()
+
+
+async def parse_batch(
+    messages: list[tuple[str, str, str]],
+) -> list[TimeOffDetails]:
+    """
+    Run (text, sender_name, ts) messages through Gemini in one call,
+    paced by the shared Gemini token bucket and retrying 429 / 5xx responses
+    with exponential backoff.  Returns one
+    TimeOffDetails per message, in input order; a message the model skipped
+    is treated as not time off.  <@USERID> mentions are swapped for cached
+    display names in one pass over the joined prompt.
+    """
+    blocks = []
+    for i, (text, sender_name, ts) in enumerate(messages, start=1):
+        sent, year = _format_ts(ts)
+        blocks.append(_MESSAGE_BLOCK_TEMPLATE.format_map(
+            {"index": i, "sender": sender_name, "sent": sent, "year": year, "text": text}
+        ))
+    prompt = _resolve_cached_mentions("\n\n".join(blocks))
+
     for attempt in range(1, MAX_RETRIES + 1):
+        await gemini_bucket.acquire()
         try:
-            return agent.run_sync(prompt).output
+            items = (await batch_agent.run(prompt)).output.items
+            break
         except ModelHTTPError as e:
-            if e.status_code == 429 and attempt < MAX_RETRIES:
-                wait = _retry_delay_from_error(e)
-                time.sleep(wait)
-            else:
+            if not _should_retry(e, attempt):
                 raise
+            delay = _backoff_delay(e, attempt)
+            if e.status_code == 429:
+                # Quota is shared: the next acquire (ours and everyone else's) waits it out
+                gemini_bucket.penalize(delay)
+            else:
+                await asyncio.sleep(delay)
 
+    by_index = {item.message_index: item for item in items}
+    return [
+        by_index.get(i) or _NOT_RETURNED
+        for i in range(1, len(messages) + 1)
+    ]
 
-def fetch_and_parse(
-    slack: WebClient,
-    channel_id: str,
-    hours_back: int = 24,
-    limit: int = 100,
-) -> list[TimeOffEntry]:
-    """
-    Fetch messages from a Slack channel and return only time-off entries.
 
-    Args:
-        slack:      Authenticated Slack WebClient.
-        channel_id: Slack channel ID to read from.
-        hours_back: How far back to look (default 24 hours).
-        limit:      Max messages to fetch (default 100).
+def _to_entry(
+    details: TimeOffDetails, raw_text: str, sender_name: str, ts: str
+) -> Optional[TimeOffEntry]:
+    """Build the API entry for a message Gemini classified as time off, else None."""
+    if not details.is_time_off_request:
+        return None
+    person = _clean_user_ref(details.person_username or sender_name)
+    coverage = _clean_user_ref(details.coverage_username) if details.coverage_username else None
+    return TimeOffEntry(
+        sent_at=ts_to_datetime(ts).isoformat(),
+        sender=sender_name,
+        message=raw_text,
+        person_username=person,
+        start_date=details.start_date,
+        end_date=details.end_date,
+        reason=details.reason,
+        coverage_username=coverage,
+        notes=details.notes,
+    )
 
-    Returns:
-        List of TimeOffEntry objects (only detected time-off messages).
+
+async def _iter_history_pages(
+    slack: AsyncWebClient, channel_id: str, hours_back: int, limit: int,
+) -> AsyncIterator[list[dict]]:
+    """
+    Yield pages of up to SLACK_PAGE_SIZE channel messages from the last
+    `hours_back` hours, newest first, following next_cursor until `limit`
+    messages have been seen.
     """
     now = datetime.now(tz=timezone.utc)
     oldest_ts = str(now.timestamp() - hours_back * 3600)
 
-    resp = slack.conversations_history(channel=channel_id, oldest=oldest_ts, limit=limit)
-    messages = list(reversed(resp.get("messages", [])))
+    cursor = None
+    remaining = limit
+    while remaining > 0:
+        resp = await slack.conversations_history(
+            channel=channel_id,
+            oldest=oldest_ts,
+            limit=min(remaining, SLACK_PAGE_SIZE),
+            cursor=cursor,
+            include_all_metadata=False,
+        )
+        page = resp.get("messages", [])[:remaining]
+        yield page
+        remaining -= len(page)
 
-    # Skip system subtypes (joins, bot integrations, etc.)
-    human_messages = [
-        m for m in messages
-        if m.get("type") == "message" and not m.get("subtype")
-    ]
+        cursor = resp.get("response_metadata", {}).get("next_cursor")
+        if not resp.get("has_more") or not cursor:
+            break
 
-    entries: list[TimeOffEntry] = []
 
-    for i, msg in enumerate(human_messages):
-        raw_text = msg.get("text", "").strip()
-        if not raw_text:
-            continue
+def _is_human(msg: dict) -> bool:
+    """A non-empty message with no system subtype (joins, bot integrations, etc.)."""
+    return msg.get("type") == "message" and not msg.get("subtype") and bool(msg.get("text", "").strip())
 
-        sent_at = ts_to_datetime(msg["ts"])
+
+async def _prepare_messages(
+    slack: AsyncWebClient, messages: list[dict],
+) -> list[tuple[str, str, str]]:
+    """
+    (text, sender_name, ts) for each of the given human messages, with
+    senders and mentions cached up front.
+    """
+    await _ensure_users(
+        slack,
+        {msg["user"] for msg in messages if msg.get("user")}
+        | _mentioned_users([msg["text"] for msg in messages]),
+    )
+
+    pending: list[tuple[str, str, str]] = []
+    for msg in messages:
+        raw_text = msg["text"].strip()
         sender_id = msg.get("user", "") or "unknown"
-        sender_name = resolve_user(slack, sender_id) if sender_id != "unknown" else "unknown"
+        sender_name = await resolve_user(slack, sender_id) if sender_id != "unknown" else "unknown"
+        pending.append((raw_text, sender_name, msg["ts"]))
+    return pending
 
-        details = parse_message(raw_text, sender_name, sent_at)
 
-        if details.is_time_off_request:
-            person = _clean_user_ref(details.person_username or sender_name)
-            coverage = _clean_user_ref(details.coverage_username) if details.coverage_username else None
-            entries.append(TimeOffEntry(
-                sent_at=sent_at.isoformat(),
-                sender=sender_name,
-                message=raw_text,
-                person_username=person,
-                start_date=details.start_date,
-                end_date=details.end_date,
-                reason=details.reason,
-                coverage_username=coverage,
-                notes=details.notes,
-            ))
+def _passes_prefilter(msg: dict) -> bool:
+    """A human message that mentions time off (see _TIMEOFF_HINT)."""
+    return _is_human(msg) and bool(_TIMEOFF_HINT.search(msg["text"]))
 
-        # Rate-limit spacing between Gemini calls (skip after last message)
-        if i < len(human_messages) - 1:
-            time.sleep(INTER_CALL_DELAY_SECONDS)
 
-    return entries
+async def _prefiltered_messages(
+    slack: AsyncWebClient, channel_id: str, hours_back: int, limit: int,
+) -> AsyncIterator[tuple[str, str, str]]:
+    """
+    Yield (text, sender_name, ts) for the prefiltered messages among the last
+    `limit` channel messages, newest first, one page of lookups at a time.
+    """
+    async for page in _iter_history_pages(slack, channel_id, hours_back, limit):
+        for message in await _prepare_messages(slack, [msg for msg in page if _passes_prefilter(msg)]):
+            yield message
+
+
+# ── Staged fetch → parse pipeline ──────────────────────────────────────────────
+# fetch_and_parse_async, iter_and_parse and fetch_and_parse_debug_async run as
+# stages joined by bounded asyncio queues, so Slack paging, Gemini calls and
+# entry assembly overlap instead of running one after the other:
+#   producer — drains the caller's message source (normally
+#              _prefiltered_messages, which pages conversations.history and
+#              caches each page's senders and mentions)
+#   batcher  — serves cached / duplicate messages locally and coalesces the
+#              rest into batches of BATCH_SIZE, or whatever arrived within
+#              BATCH_WINDOW
+#   workers  — MAX_CONCURRENT_BATCHES of them, one Gemini call per batch
+# Parsed messages land on an unbounded result queue drained by the caller.
+_DONE = object()  # end-of-stream marker on every queue
+
+
+async def _run_stages(
+    source: AsyncIterator[tuple[str, str, str]], result_q: asyncio.Queue,
+) -> None:
+    msg_q: asyncio.Queue = asyncio.Queue(maxsize=BATCH_SIZE * MAX_CONCURRENT_BATCHES)
+    batch_q: asyncio.Queue = asyncio.Queue(maxsize=MAX_CONCURRENT_BATCHES)
+    # parse key → (index, message) of every message waiting on that parse
+    waiting: dict[str, list[tuple[int, tuple[str, str, str]]]] = {}
+
+    async def producer() -> None:
+        index = 0  # source order, i.e. newest first
+        async for message in source:
+            await msg_q.put((index, message))
+            index += 1
+        await msg_q.put(_DONE)
+
+    async def batcher() -> None:
+        loop = asyncio.get_running_loop()
+        batch: list[tuple[str, tuple[str, str, str]]] = []
+        deadline = 0.0
+        done = False
+        while not done:
+            try:
+                timeout = max(0.0, deadline - loop.time()) if batch else None
+                item = await asyncio.wait_for(msg_q.get(), timeout)
+            except TimeoutError:
+                item = None
+
+            if item is _DONE:
+                done = True
+            elif item is not None:
+                index, message = item
+                key = _parse_key(*message)
+                cached = _parse_cache.get(key)
+                if cached is not None:
+                    result_q.put_nowait((index, message, cached, False))
+                elif key in waiting:
+                    waiting[key].append((index, message))
+                else:
+                    waiting[key] = [(index, message)]
+                    if not batch:
+                        deadline = loop.time() + BATCH_WINDOW
+                    batch.append((key, message))
+
+            if batch and (item is None or done or len(batch) >= BATCH_SIZE):
+                await batch_q.put(batch)
+                batch = []
+        for _ in range(MAX_CONCURRENT_BATCHES):
+            await batch_q.put(_DONE)
+
+    async def worker() -> None:
+        while (batch := await batch_q.get()) is not _DONE:
+            parsed = await parse_batch([message for _, message in batch])
+            for (key, _), details in zip(batch, parsed):
+                if details is not _NOT_RETURNED:
+                    _parse_cache[key] = details
+                # Only the first waiter's message went to Gemini; the rest are
+                # duplicates that share its parse
+                for n, (index, message) in enumerate(waiting.pop(key)):
+                    result_q.put_nowait((index, message, details, n == 0))
 
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(producer())
+            tg.create_task(batcher())
+            for _ in range(MAX_CONCURRENT_BATCHES):
+                tg.create_task(worker())
+    except* Exception as eg:
+        # Surface the first failure (e.g. SlackApiError) to the caller as-is
+        result_q.put_nowait(eg.exceptions[0])
+    else:
+        result_q.put_nowait(_DONE)
+
+
+async def _pipeline(
+    source: AsyncIterator[tuple[str, str, str]],
+) -> AsyncIterator[tuple[int, tuple[str, str, str], TimeOffDetails, bool]]:
+    """
+    Yield (index, (text, sender_name, ts), details, sent) for every message
+    from `source` in completion order; index is the message's position in the
+    source, and sent is False when the parse came from the cache or from a
+    duplicate message instead of a Gemini call of its own.
+    """
+    result_q: asyncio.Queue = asyncio.Queue()
+    runner = asyncio.create_task(_run_stages(source, result_q))
+    try:
+        while (item := await result_q.get()) is not _DONE:
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # The consumer stopped early or a stage failed: tear the stages down
+        runner.cancel()
 
-def fetch_and_parse_debug(
-    slack: WebClient,
+
+async def fetch_and_parse_async(
+    slack: AsyncWebClient,
     channel_id: str,
     hours_back: int = 24,
     limit: int = 100,
-) -> tuple[list[TimeOffEntry], list[dict]]:
+) -> list[TimeOffEntry]:
     """
-    Same as fetch_and_parse but also returns a per-message debug trace.
-    The second return value is a list of dicts suitable for MessageDebug.
-    No DB writes happen here.
+    Fetch messages from a Slack channel and return only time-off entries,
+    oldest first.  Slack paging, Gemini calls (BATCH_SIZE messages each, up
+    to MAX_CONCURRENT_BATCHES at once under the shared Gemini rate limit) and
+    entry assembly run as overlapping pipeline stages.
+
+    Args:
+        slack:      Authenticated Slack AsyncWebClient.
+        channel_id: Slack channel ID to read from.
+        hours_back: How far back to look (default 24 hours).
+        limit:      Max messages to fetch (default 100).
+
+    Returns:
+        List of TimeOffEntry objects (only detected time-off messages).
+    """
+    found: list[tuple[int, TimeOffEntry]] = []
+    async for index, message, details, _ in _pipeline(
+        _prefiltered_messages(slack, channel_id, hours_back, limit)
+    ):
+        entry = _to_entry(details, *message)
+        if entry:
+            found.append((index, entry))
+    # Fetch order is newest first
+    found.sort(key=itemgetter(0), reverse=True)
+    return [entry for _, entry in found]
+
+
+async def iter_and_parse(
+    slack: AsyncWebClient,
+    channel_id: str,
+    hours_back: int = 24,
+    limit: int = 100,
+) -> AsyncIterator[TimeOffEntry]:
+    """
+    Streaming fetch_and_parse_async: yields each time-off entry as soon as
+    its Gemini batch comes back, so callers can emit results progressively.
+    Entries arrive in completion order, not message order.
     """
-    from typing import Any
+    async for _, message, details, _ in _pipeline(
+        _prefiltered_messages(slack, channel_id, hours_back, limit)
+    ):
+        entry = _to_entry(details, *message)
+        if entry:
+            yield entry
 
-    now = datetime.now(tz=timezone.utc)
-    oldest_ts = str(now.timestamp() - hours_back * 3600)
 
-    resp = slack.conversations_history(channel=channel_id, oldest=oldest_ts, limit=limit)
-    all_messages = list(reversed(resp.get("messages", [])))
+async def _run_with_client(fn, *args):
+    """Run fn(client, *args) with a client for this loop, closed afterwards."""
+    try:
+        return await fn(get_async_slack_client(), *args)
+    finally:
+        await close_async_slack_client()
 
-    debug_rows: list[dict[str, Any]] = []
-    entries: list[TimeOffEntry] = []
 
-    for msg in all_messages:
-        ts_str = msg.get("ts", "")
-        sender_id = msg.get("user", "") or "unknown"
-        raw_text = msg.get("text", "").strip()
-        subtype = msg.get("subtype")
-        msg_type = msg.get("type", "")
-
-        row: dict[str, Any] = {
-            "ts": ts_str,
-            "sender_id": sender_id,
-            "sender_name": sender_id,  # filled in below if not filtered
-            "text_preview": raw_text[:120],
-            "filtered": False,
-            "filter_reason": None,
-            "is_time_off": None,
-            "person_username": None,
-            "start_date": None,
-            "end_date": None,
-            "reason": None,
-            "coverage_username": None,
-            "match_result": None,
-        }
-
-        # Filter checks
-        if msg_type != "message" or subtype:
-            row["filtered"] = True
-            row["filter_reason"] = f"subtype={subtype!r}" if subtype else f"type={msg_type!r}"
-            debug_rows.append(row)
-            continue
-
-        if not raw_text:
-            row["filtered"] = True
-            row["filter_reason"] = "empty text"
-            debug_rows.append(row)
-            continue
-
-        sent_at = ts_to_datetime(ts_str)
-        sender_name = resolve_user(slack, sender_id) if sender_id != "unknown" else "unknown"
-        row["sender_name"] = sender_name
-
-        details = parse_message(raw_text, sender_name, sent_at)
+def fetch_and_parse(
+    channel_id: str,
+    hours_back: int = 24,
+    limit: int = 100,
+) -> list[TimeOffEntry]:
+    """
+    Blocking wrapper around fetch_and_parse_async for the CLI.  Runs on its
+    own event loop, with a Slack client that lives for just this call.
+    """
+    return asyncio.run(_run_with_client(fetch_and_parse_async, channel_id, hours_back, limit))
+
+
+def _debug_row(msg: dict) -> dict:
+    """The debug trace row for one fetched message, with the prefilter verdict."""
+    raw_text = msg.get("text", "").strip()
+    subtype = msg.get("subtype")
+    msg_type = msg.get("type", "")
+    sender_id = msg.get("user", "") or "unknown"
+
+    filter_reason = None
+    if msg_type != "message" or subtype:
+        filter_reason = f"subtype={subtype!r}" if subtype else f"type={msg_type!r}"
+    elif not raw_text:
+        filter_reason = "empty text"
+    elif not _TIMEOFF_HINT.search(raw_text):
+        filter_reason = "no time-off keywords"
+
+    return {
+        "ts": msg.get("ts", ""),
+        "sender_id": sender_id,
+        "sender_name": sender_id,  # filled in once resolved if not filtered
+        "text_preview": raw_text[:120],
+        "filtered": filter_reason is not None,
+        "filter_reason": filter_reason,
+        "cached": None,
+        "is_time_off": None,
+        "person_username": None,
+        "start_date": None,
+        "end_date": None,
+        "reason": None,
+        "coverage_username": None,
+        "match_result": None,
+    }
+
+
+async def fetch_and_parse_debug_async(
+    slack: AsyncWebClient,
+    channel_id: str,
+    hours_back: int = 24,
+    limit: int = 100,
+) -> tuple[list[TimeOffEntry], list[dict]]:
+    """
+    Same as fetch_and_parse_async but also returns a per-message debug trace,
+    oldest first.  The second return value is a list of dicts suitable for
+    MessageDebug.  No DB writes happen here.
+    """
+    debug_rows: list[dict] = []
+    # Pipeline index → the debug row that message fills in
+    pending_rows: list[dict] = []
+
+    async def source() -> AsyncIterator[tuple[str, str, str]]:
+        async for page in _iter_history_pages(slack, channel_id, hours_back, limit):
+            rows = [_debug_row(msg) for msg in page]
+            debug_rows.extend(rows)
+            kept = [(row, msg) for row, msg in zip(rows, page) if not row["filtered"]]
+            prepared = await _prepare_messages(slack, [msg for _, msg in kept])
+            for (row, _), message in zip(kept, prepared):
+                row["sender_name"] = message[1]
+                pending_rows.append(row)
+                yield message
+
+    found: list[tuple[int, TimeOffEntry]] = []
+    async for index, message, details, sent in _pipeline(source()):
+        row = pending_rows[index]
+        row["cached"] = not sent
         row["is_time_off"] = details.is_time_off_request
+        entry = _to_entry(details, *message)
+        if entry:
+            row["person_username"] = entry.person_username
+            row["start_date"] = entry.start_date
+            row["end_date"] = entry.end_date
+            row["reason"] = entry.reason
+            row["coverage_username"] = entry.coverage_username
+            found.append((index, entry))
 
-        if details.is_time_off_request:
-            person = _clean_user_ref(details.person_username or sender_name)
-            coverage = _clean_user_ref(details.coverage_username) if details.coverage_username else None
-            row["person_username"] = person
-            row["start_date"] = details.start_date
-            row["end_date"] = details.end_date
-            row["reason"] = details.reason
-            row["coverage_username"] = coverage
-
-            entries.append(TimeOffEntry(
-                sent_at=sent_at.isoformat(),
-                sender=sender_name,
-                message=raw_text,
-                person_username=person,
-                start_date=details.start_date,
-                end_date=details.end_date,
-                reason=details.reason,
-                coverage_username=coverage,
-                notes=details.notes,
-            ))
-
-        debug_rows.append(row)
-
-        if len(debug_rows) < len(all_messages):
-            time.sleep(INTER_CALL_DELAY_SECONDS)
-
-    return entries, debug_rows
+    # Fetch order is newest first
+    found.sort(key=itemgetter(0), reverse=True)
+    debug_rows.reverse()
+    return [entry for _, entry in found], debug_rows
+
+
+def fetch_and_parse_debug(
+    channel_id: str,
+    hours_back: int = 24,
+    limit: int = 100,
+) -> tuple[list[TimeOffEntry], list[dict]]:
+    """Blocking wrapper around fetch_and_parse_debug_async (see fetch_and_parse)."""
+    return asyncio.run(
+        _run_with_client(fetch_and_parse_debug_async, channel_id, hours_back, limit)
+    )
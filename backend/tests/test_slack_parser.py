@@ -0,0 +1,101 @@
+"""
+Unit tests for the pure helpers in slack_parser.py.
+
+Run from backend/:  python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# The Gemini agents are built at import time and need a key to exist
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+import slack_parser  # noqa: E402
+from pydantic_ai.exceptions import ModelHTTPError  # noqa: E402
+
+
+class TimeOffHintTest(unittest.TestCase):
+    """_TIMEOFF_HINT decides which messages ever reach Gemini."""
+
+    POSITIVE = [
+        "I'm OOO tomorrow",
+        "Taking PTO 3/2-3/6, Sam is covering",
+        "Out sick today",
+        "Heading to the dentist, back in an hour",
+        # weekday and date forms
+        "I'm off Friday",
+        "Taking Friday off",
+        "Taking Monday and Tuesday off",
+        "Out Friday, back Monday",
+        "Off 2/21-2/23",
+        "Out 3/12 - 3/14",
+        # other phrasings
+        "I'll be unavailable 3/4-3/6",
+        "Won't be in tomorrow",
+        "Won’t be in tomorrow",
+        "not working next week",
+        "half day today",
+        "OOTO next week",
+        "Offline tomorrow",
+    ]
+
+    NEGATIVE = [
+        "Merged the PR, can someone review the follow-up?",
+        "Standup moved to 10:30",
+        "lgtm",
+    ]
+
+    def test_time_off_messages_match(self):
+        for text in self.POSITIVE:
+            with self.subTest(text=text):
+                self.assertIsNotNone(slack_parser._TIMEOFF_HINT.search(text))
+
+    def test_unrelated_messages_are_filtered(self):
+        for text in self.NEGATIVE:
+            with self.subTest(text=text):
+                self.assertIsNone(slack_parser._TIMEOFF_HINT.search(text))
+
+
+
+def _http_error(body, status_code: int = 429) -> ModelHTTPError:
+    return ModelHTTPError(status_code=status_code, model_name="gemini", body=body)
+
+
+class RetryDelayFromErrorTest(unittest.TestCase):
+    """_retry_delay_from_error must never raise while handling a 429."""
+
+    RETRY_INFO = "type.googleapis.com/google.rpc.RetryInfo"
+
+    def test_reads_retry_info_seconds(self):
+        body = {"error": {"details": [{"@type": self.RETRY_INFO, "retryDelay": "37s"}]}}
+        self.assertEqual(slack_parser._retry_delay_from_error(_http_error(body)), 42)
+
+    def test_error_is_a_string(self):
+        body = {"error": "RESOURCE_EXHAUSTED"}
+        self.assertEqual(slack_parser._retry_delay_from_error(_http_error(body)), 65)
+
+    def test_details_hold_non_dict_entries(self):
+        body = {"error": {"details": ["quota exceeded", None]}}
+        self.assertEqual(slack_parser._retry_delay_from_error(_http_error(body)), 65)
+
+    def test_details_is_not_a_list(self):
+        body = {"error": {"details": "quota exceeded"}}
+        self.assertEqual(slack_parser._retry_delay_from_error(_http_error(body)), 65)
+
+    def test_retry_delay_is_not_a_string(self):
+        body = {"error": {"details": [{"@type": self.RETRY_INFO, "retryDelay": 30}]}}
+        self.assertEqual(slack_parser._retry_delay_from_error(_http_error(body)), 65)
+
+    def test_body_is_not_a_dict(self):
+        self.assertEqual(slack_parser._retry_delay_from_error(_http_error("Too Many Requests")), 65)
+
+    def test_backoff_survives_malformed_body(self):
+        exc = _http_error({"error": "RESOURCE_EXHAUSTED"})
+        self.assertLessEqual(slack_parser._backoff_delay(exc, 1), slack_parser.BACKOFF_MAX + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()